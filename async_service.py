@@ -0,0 +1,210 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import cv2
+import numpy as np
+from speck_parallel import cipher_image
+from cipher_modes import random_nonce, reserve_counters
+from encrypted_image_file import EncryptedImageFile, pack_payload, unpack_payload
+from speck_encryption import load_image_for_encryption, load_or_create_key, write_encrypted_image
+
+# Jobs waiting between two stages; a full queue makes the previous stage wait
+DEFAULT_QUEUE_SIZE = 8
+
+class AsyncCipherService:
+    """asyncio pipeline: decode -> cipher -> encode stages joined by bounded queues"""
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE, executor=None, decoders=2, encoders=2):
+        self.queue_size = queue_size
+        self.decoders = decoders  # Concurrent read/decode threads
+        self.encoders = encoders  # Concurrent encode/write threads
+        # Cipher rounds are CPU-bound and run in a process pool unless an executor is given
+        self._owns_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor()
+        self.ciphers = getattr(self.executor, '_max_workers', None) or os.cpu_count() or 1
+        self._key_lock = threading.Lock()  # Concurrent first requests must not create two keys
+        self._tasks = []
+        self._pending = set()  # Futures of requests not resolved yet
+        self._loop = None
+
+    async def start(self):
+        """Start the stage tasks on the running event loop"""
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._decode_queue = asyncio.Queue(self.queue_size)
+        self._cipher_queue = asyncio.Queue(self.queue_size)
+        self._encode_queue = asyncio.Queue(self.queue_size)
+        stages = ([(self._decode_stage, self.decoders), (self._cipher_stage, self.ciphers),
+                   (self._encode_stage, self.encoders)])
+        self._tasks = [asyncio.create_task(stage()) for stage, count in stages for _ in range(count)]
+
+    async def close(self):
+        """Stop the stages (pending requests are cancelled) and release an owned executor"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Without their stages these requests would never resolve; their callers get CancelledError
+        for future in list(self._pending):
+            future.cancel()
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def encrypt(self, image_path, key_path, output_path, packing='none', mode='ecb', nonce=None):
+        """Encrypt one image like speck_encryption.encrypt_image, without blocking the loop"""
+        return await self._submit({'decrypt': False, 'input': image_path, 'key_path': key_path,
+                                   'output': output_path, 'packing': packing, 'mode': mode, 'nonce': nonce})
+
+    async def decrypt(self, encrypted_path, key_path, output_path):
+        """Decrypt one .bin file like speck_decryption.decrypt_image, without blocking the loop"""
+        return await self._submit({'decrypt': True, 'input': encrypted_path, 'key_path': key_path,
+                                   'output': output_path})
+
+    async def _submit(self, job):
+        await self.start()
+        future = self._loop.create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        job['future'] = future
+        # Waits while the pipeline is full (backpressure), unless close() cancels the request first
+        put = asyncio.ensure_future(self._decode_queue.put(job))
+        try:
+            await asyncio.wait([put, future], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            put.cancel()
+        return await future
+
+    async def _run_stage(self, queue, work, next_queue=None):
+        """Take jobs from queue, run `work` on each and pass them on (or fail their future)"""
+        while True:
+            job = await queue.get()
+            try:
+                await work(job)
+            except Exception as error:
+                if not job['future'].done():
+                    job['future'].set_exception(error)
+            else:
+                if next_queue is not None:
+                    await next_queue.put(job)
+            finally:
+                queue.task_done()
+
+    async def _decode_stage(self):
+        await self._run_stage(self._decode_queue, lambda job: asyncio.to_thread(self._decode, job),
+                              self._cipher_queue)
+
+    async def _cipher_stage(self):
+        await self._run_stage(self._cipher_queue, self._cipher, self._encode_queue)
+
+    async def _encode_stage(self):
+        await self._run_stage(self._encode_queue, lambda job: asyncio.to_thread(self._encode, job))
+
+    def _decode(self, job):
+        """Thread: read the key and the source, producing the uint16 words to cipher"""
+        if job['decrypt']:
+            if not os.path.exists(job['key_path']):
+                raise FileNotFoundError(f"Key file {job['key_path']} not found")
+            job['key'] = np.load(job['key_path'])
+            with EncryptedImageFile(job['input']) as encrypted_file:
+                job['words'] = np.array(encrypted_file.data)  # Read the payload into memory
+                job['packing'] = encrypted_file.packing
+                job['mode'] = encrypted_file.cipher_mode
+                job['nonce'] = encrypted_file.nonce
+            return
+
+        image = load_image_for_encryption(job['input'])
+        if image is None:
+            raise ValueError(f"Could not load image from {job['input']}")
+        with self._key_lock:
+            job['key'] = load_or_create_key(job['key_path'])
+        job['shape'] = image.shape
+        job['words'] = pack_payload(image, job['packing'])
+        if job['mode'] == 'ecb':
+            job['nonce'] = 0
+        elif job['nonce'] is None:
+            # CTR takes a counter range of its own from the key file (see reserve_counters)
+            job['nonce'] = (reserve_counters(job['key_path'], job['words'].size // 2) if job['mode'] == 'ctr'
+                            else random_nonce())
+
+    async def _cipher(self, job):
+        """Executor: run the cipher rounds over the whole image"""
+        job['words'] = await self._loop.run_in_executor(self.executor, partial(
+            cipher_image, job['words'], job['key'], decrypt=job['decrypt'], mode=job['mode'],
+            nonce=job['nonce']))
+
+    def _encode(self, job):
+        """Thread: write the result and resolve the request"""
+        if job['decrypt']:
+            image = unpack_payload(job['words'], job['packing'])
+            if not cv2.imwrite(job['output'], image):
+                raise ValueError(f"Could not write decrypted image to {job['output']}")
+            shape = image.shape
+        else:
+            height, width, channels = job['shape']
+            write_encrypted_image(job['output'], job['words'], width, height, channels,
+                                  job['packing'], job['mode'], job['nonce'])
+            shape = job['shape']
+        result = {'input': job['input'], 'output': job['output'], 'shape': shape, 'mode': job['mode']}
+        # Futures belong to the event loop, so resolve from its thread
+        self._loop.call_soon_threadsafe(_resolve, job['future'], result)
+
+def _resolve(future, result):
+    if not future.done():
+        future.set_result(result)
+
+# One shared service per event loop for the module-level helpers
+_default_service = None
+
+async def get_default_service():
+    """Service shared by encrypt_image_async/decrypt_image_async on the running loop"""
+    global _default_service
+    loop = asyncio.get_running_loop()
+    if _default_service is None or _default_service._loop is not loop:
+        if _default_service is not None and _default_service._owns_executor:
+            _default_service.executor.shutdown(wait=False)  # Left over from a finished loop
+        _default_service = AsyncCipherService()
+        await _default_service.start()
+    return _default_service
+
+async def encrypt_image_async(image_path, key_path, output_path, packing='none', mode='ecb', nonce=None,
+                              service=None):
+    """Awaitable encrypt_image: decode, cipher and encode run as pipelined stages"""
+    service = service or await get_default_service()
+    return await service.encrypt(image_path, key_path, output_path, packing, mode, nonce)
+
+async def decrypt_image_async(encrypted_path, key_path, output_path, service=None):
+    """Awaitable decrypt_image: decode, cipher and encode run as pipelined stages"""
+    service = service or await get_default_service()
+    return await service.decrypt(encrypted_path, key_path, output_path)
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    async def _example(paths, key_path):
+        # Many images in flight keep the read, cipher and write stages busy at the same time
+        async with AsyncCipherService() as service:
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                service.encrypt(path, key_path, os.path.splitext(path)[0] + '_async.bin') for path in paths])
+            await asyncio.gather(*[
+                service.decrypt(result['output'], key_path, os.path.splitext(result['input'])[0] + '_async.png')
+                for result in results])
+            elapsed = time.perf_counter() - start
+        print(f"✅ Encrypted and decrypted {len(paths)} images in {elapsed:.2f}s")
+
+    if len(sys.argv) < 2:
+        print(f"Usage: python {sys.argv[0]} <image> [<image> ...]")
+    else:
+        asyncio.run(_example(sys.argv[1:], "encryption_key.npy"))
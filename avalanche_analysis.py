@@ -0,0 +1,123 @@
+import sys
+import time
+
+import numpy as np
+from speck_cipher import SpeckCipher, encrypt_rounds_in_place
+
+BLOCK_BITS = 32  # Block value (x << 16) | y: bits 0-15 are y, bits 16-31 are x
+KEY_BITS = 16
+
+# Popcount: NumPy >= 2.0 has np.bitwise_count, older versions use a 16-bit table
+_POPCOUNT_16 = None
+
+def popcount32(values):
+    """Number of set bits of every uint32 value"""
+    values = np.asarray(values, dtype=np.uint32)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    global _POPCOUNT_16
+    if _POPCOUNT_16 is None:
+        words = np.arange(65536, dtype=np.uint32)
+        _POPCOUNT_16 = np.zeros(65536, dtype=np.uint8)
+        for bit in range(16):
+            _POPCOUNT_16 += ((words >> bit) & 1).astype(np.uint8)
+    return _POPCOUNT_16[values & 0xFFFF] + _POPCOUNT_16[values >> 16]
+
+def combine_words(x, y):
+    """32-bit block values (x << 16) | y"""
+    return (x.astype(np.uint32) << 16) | y
+
+def flipped_inputs(xs, ys):
+    """(33, n) batches: row 0 is the baseline, row 1 + i has block bit i flipped"""
+    blocks = np.repeat(combine_words(xs, ys)[None], BLOCK_BITS + 1, axis=0)
+    blocks[1:] ^= (np.uint32(1) << np.arange(BLOCK_BITS, dtype=np.uint32))[:, None]
+    return (blocks >> 16).astype(np.uint16), (blocks & 0xFFFF).astype(np.uint16)
+
+class AvalancheStatistics:
+    """Per-round counters of output-bit flips relative to the baseline row of a batch"""
+
+    def __init__(self, variants, rounds):
+        self.samples = 0
+        self.flip_counts = np.zeros((variants, BLOCK_BITS), dtype=np.int64)  # After the last round
+        self.weight_sums = np.zeros((rounds, variants), dtype=np.int64)  # Popcount of the difference
+        self.dependency = np.zeros((rounds, variants), dtype=np.uint32)  # OR of all differences
+
+    def update_round(self, round_index, x, y):
+        """Record the differences of rows 1.. against row 0 after one round"""
+        difference = combine_words(x[1:], y[1:]) ^ combine_words(x[:1], y[:1])
+        self.weight_sums[round_index] += popcount32(difference).sum(axis=1, dtype=np.int64)
+        self.dependency[round_index] |= np.bitwise_or.reduce(difference, axis=1)
+        return difference
+
+    def update_final(self, difference):
+        for bit in range(BLOCK_BITS):
+            self.flip_counts[:, bit] += np.count_nonzero(difference & np.uint32(1 << bit), axis=1)
+        self.samples += difference.shape[1]
+
+    def results(self):
+        """Bit-flip probability matrix and per-round diffusion curves"""
+        return {
+            'samples': self.samples,
+            # matrix[i, j]: probability that output bit j flips when input bit i flips
+            'matrix': self.flip_counts / self.samples,
+            # Average fraction of the 32 output bits that flip, per round and input bit
+            'avalanche_per_round': self.weight_sums / (self.samples * BLOCK_BITS),
+            # Fraction of (input bit, output bit) pairs seen to interact by each round
+            'completeness_per_round': popcount32(self.dependency).sum(axis=1) / (
+                self.dependency.shape[1] * BLOCK_BITS),
+        }
+
+def _run_batches(x_builder, round_keys, blocks, batch, rng, variants):
+    """Step every batch through the rounds, recording the differences after each round"""
+    statistics = AvalancheStatistics(variants, len(round_keys))
+    for start in range(0, blocks, batch):
+        size = min(batch, blocks - start)
+        xs = rng.integers(0, 65536, size, dtype=np.uint16)
+        ys = rng.integers(0, 65536, size, dtype=np.uint16)
+        # Baseline and all flipped variants are encrypted together as one array
+        x, y = x_builder(xs, ys)
+        tmp = np.empty_like(x)
+        for round_index, k in enumerate(round_keys):
+            encrypt_rounds_in_place(x, y, tmp, [k])
+            difference = statistics.update_round(round_index, x, y)
+        statistics.update_final(difference)
+    return statistics.results()
+
+def plaintext_avalanche(key, blocks=1 << 20, rounds=22, batch=1 << 15, seed=0):
+    """Flip each of the 32 plaintext bits of random blocks under one key"""
+    speck = SpeckCipher(key)
+    rng = np.random.default_rng(seed)
+    return _run_batches(flipped_inputs, speck.round_keys[:rounds], blocks, batch, rng, BLOCK_BITS)
+
+def key_avalanche(key, blocks=1 << 20, rounds=22, batch=1 << 15, seed=0):
+    """Flip each of the 16 key bits: the same blocks under key and key ^ (1 << b)"""
+    keys = [int(key)] + [int(key) ^ (1 << bit) for bit in range(KEY_BITS)]
+    # (rounds, 17, 1): one round key per variant, broadcast over the blocks
+    schedules = SpeckCipher.schedules_for(keys, rounds).T[:, :, None]
+    rng = np.random.default_rng(seed)
+
+    def same_blocks(xs, ys):
+        return np.repeat(xs[None], len(keys), axis=0), np.repeat(ys[None], len(keys), axis=0)
+
+    return _run_batches(same_blocks, list(schedules), blocks, batch, rng, KEY_BITS)
+
+def print_report(results, title, row_label):
+    matrix = results['matrix']
+    print(f"\n{title} ({results['samples']:,} random blocks)")
+    print(f"Bit-flip probabilities: mean {matrix.mean():.4f}, min {matrix.min():.4f}, "
+          f"max {matrix.max():.4f}, worst |p - 0.5| = {np.abs(matrix - 0.5).max():.4f}")
+    print(f"{'round':>5} {'avalanche':>10} {'completeness':>13}")
+    avalanche = results['avalanche_per_round'].mean(axis=1)
+    for round_index, (value, complete) in enumerate(zip(avalanche, results['completeness_per_round'])):
+        print(f"{round_index + 1:>5} {value:>10.4f} {complete:>13.4f}")
+    worst = np.abs(results['avalanche_per_round'][-1] - 0.5).argmax()
+    print(f"Least diffused {row_label}: bit {worst} "
+          f"({results['avalanche_per_round'][-1][worst]:.4f} of output bits flip)")
+
+if __name__ == "__main__":
+    key = int(sys.argv[1], 0) if len(sys.argv) > 1 else int(np.load("encryption_key.npy"))
+    blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 1 << 20
+    start = time.perf_counter()
+    print_report(plaintext_avalanche(key, blocks), "Plaintext-bit avalanche", "input")
+    print_report(key_avalanche(key, blocks), "Key-bit avalanche", "key")
+    print(f"\nDone in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,177 @@
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from speck_encryption import encrypt_image, load_or_create_key
+from speck_decryption import decrypt_image
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp', '.npy')
+OPERATIONS = ('encrypt', 'decrypt', 'roundtrip')
+JOURNAL_NAME = 'batch_journal.jsonl'
+
+def _is_within(path, directory):
+    """True if path is directory or lies below it"""
+    path, directory = os.path.realpath(path), os.path.realpath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+def collect_inputs(source, operation='roundtrip', exclude_dir=None):
+    """Input paths from a directory (searched recursively) or a manifest with one path per line.
+
+    Nothing below exclude_dir is returned, so an output folder inside the
+    source is never read back as new inputs on the next run.
+    """
+    if os.path.isdir(source):
+        extensions = ('.bin',) if operation == 'decrypt' else IMAGE_EXTENSIONS
+        paths = []
+        for folder, dirs, names in os.walk(source):
+            if exclude_dir is not None:
+                dirs[:] = [d for d in dirs if not _is_within(os.path.join(folder, d), exclude_dir)]
+            paths.extend(os.path.join(folder, name) for name in names if name.lower().endswith(extensions))
+        return sorted(paths), source
+
+    # Manifest: blank lines and '#' comments are skipped, relative paths are relative to the manifest
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                path = line if os.path.isabs(line) else os.path.join(base, line)
+                if exclude_dir is None or not _is_within(path, exclude_dir):
+                    paths.append(path)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else base
+    return paths, root
+
+def output_paths(input_path, root, output_dir, operation):
+    """Per-item outputs mirroring the input's path below root, so items never clobber each other.
+
+    Image inputs keep their extension (a.png -> a.png.bin) so a.png and a.jpg in
+    one folder get separate outputs; decrypt inputs only drop '.bin'.
+    """
+    stem = os.path.join(output_dir, os.path.relpath(os.path.abspath(input_path), os.path.abspath(root)))
+    if operation == 'decrypt':
+        if stem.lower().endswith('.bin'):
+            stem = stem[:-len('.bin')]
+        return {'decrypted': stem + '.png'}
+    outputs = {'encrypted': stem + '.bin'}
+    if operation == 'roundtrip':
+        outputs['decrypted'] = stem + '.decrypted.png'
+    return outputs
+
+def read_journal(journal_path):
+    """Input paths already completed by an earlier (possibly interrupted) run"""
+    done = set()
+    if os.path.exists(journal_path):
+        with open(journal_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # A line cut short by the interruption
+                if entry.get('status') == 'ok':
+                    done.add(entry['input'])
+    return done
+
+def _process_item(task):
+    """Worker: encrypt and/or decrypt one image; returns a journal entry"""
+    input_path, outputs, key_path, operation, options = task
+    start = time.perf_counter()
+    entry = {'input': input_path, 'outputs': outputs, 'bytes': os.path.getsize(input_path)}
+    try:
+        for path in outputs.values():
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            if os.path.exists(path):
+                os.remove(path)  # Leftovers of an interrupted run must not count as output
+        # The pipeline functions report by printing; keep worker output quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            if operation in ('encrypt', 'roundtrip'):
+                encrypt_image(input_path, key_path, outputs['encrypted'], **options)
+            if operation in ('decrypt', 'roundtrip'):
+                encrypted_path = input_path if operation == 'decrypt' else outputs['encrypted']
+                if os.path.exists(encrypted_path):
+                    decrypt_image(encrypted_path, key_path, outputs['decrypted'])
+        missing = [path for path in outputs.values() if not os.path.exists(path)]
+        entry['status'] = 'failed' if missing else 'ok'
+        if missing:
+            entry['error'] = f"No output written for {', '.join(missing)}"
+    except Exception as error:  # One bad image must not stop the batch
+        entry['status'] = 'failed'
+        entry['error'] = f"{type(error).__name__}: {error}"
+    entry['seconds'] = time.perf_counter() - start
+    return entry
+
+def run_batch(source, output_dir, key_path="encryption_key.npy", operation='roundtrip', workers=None,
+              resume=True, **options):
+    """Process every image of a directory or manifest across a process pool; returns a summary"""
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown batch operation {operation!r}, expected one of {OPERATIONS}")
+    if not os.path.exists(source):
+        print(f"Error: Batch source {source} not found")
+        return
+
+    if os.path.isdir(source) and _is_within(source, output_dir):
+        print(f"Error: Batch source {source} is inside the output directory {output_dir}")
+        return
+    inputs, root = collect_inputs(source, operation, exclude_dir=output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    journal_path = os.path.join(output_dir, JOURNAL_NAME)
+    done = read_journal(journal_path) if resume else set()
+    pending = [path for path in inputs if path not in done]
+
+    # Two items writing the same output would overwrite (or, in parallel, delete) each other
+    owners = {}
+    for path in inputs:
+        for output in output_paths(path, root, output_dir, operation).values():
+            owners.setdefault(os.path.normcase(os.path.abspath(output)), []).append(path)
+    clashes = [paths for paths in owners.values() if len(paths) > 1]
+    if clashes:
+        print(f"Error: {len(clashes)} outputs would be written by more than one input, "
+              f"e.g. {', '.join(clashes[0])}")
+        return
+    print(f"Batch: {len(inputs)} items, {len(inputs) - len(pending)} already done, {len(pending)} to process")
+
+    # Create the key once up front so workers never race to generate it
+    if operation == 'decrypt' and not os.path.exists(key_path):
+        print(f"Error: Key file {key_path} not found")
+        return
+    load_or_create_key(key_path)
+    if operation != 'decrypt' and options.get('mode') == 'ctr':
+        print(f"⚠️ CTR mode: each image takes its own counter range from {key_path}.ctr; "
+              f"one key covers 2^32 blocks (about 43,690 256x256 color images)")
+
+    summary = {'items': len(pending), 'ok': 0, 'failed': 0, 'bytes': 0, 'skipped': len(inputs) - len(pending)}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(journal_path, 'a') as journal:
+        futures = [pool.submit(_process_item, (path, output_paths(path, root, output_dir, operation),
+                                               key_path, operation, options))
+                   for path in pending]
+        for done_count, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            # Only this process writes the journal; each line is flushed as soon as an item finishes
+            journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            summary[entry['status']] += 1
+            summary['bytes'] += entry['bytes'] if entry['status'] == 'ok' else 0
+            if entry['status'] != 'ok':
+                print(f"❌ {entry['input']}: {entry['error']}")
+            if done_count % 100 == 0:
+                print(f"   {done_count}/{len(pending)} items processed")
+
+    summary['seconds'] = time.perf_counter() - start
+    summary['items_per_s'] = summary['ok'] / summary['seconds'] if summary['seconds'] else 0.0
+    summary['mb_per_s'] = summary['bytes'] / 2**20 / summary['seconds'] if summary['seconds'] else 0.0
+    print(f"✅ Batch {operation} finished: {summary['ok']} ok, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped in {summary['seconds']:.2f}s")
+    print(f"   Throughput: {summary['items_per_s']:.1f} images/s, {summary['mb_per_s']:.2f} MB/s of input")
+    print(f"   Outputs in {output_dir}, journal {journal_path}")
+    return summary
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 3:
+        print(f"Usage: python {sys.argv[0]} <directory|manifest> <output_dir> [encrypt|decrypt|roundtrip]")
+    else:
+        run_batch(sys.argv[1], sys.argv[2], operation=sys.argv[3] if len(sys.argv) > 3 else 'roundtrip')
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Benchmarks run from the repository root or from this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import optimized
+from speck_cipher import SpeckCipher, benchmark_chunking
+from bitsliced_speck import BitslicedSpeck
+from codebook_cipher import CodebookCipher
+
+BENCH_KEY = 0x1234
+
+def _random_words(count, seed=0, high=65536):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, high, count, dtype=np.uint16), rng.integers(0, 65536, count, dtype=np.uint16)
+
+def _blocks_per_second(function, blocks, repeats):
+    """Best-of-`repeats` rate of a call that processes `blocks` blocks"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return blocks / best
+
+def benchmark_scalar(blocks=2000, repeats=3):
+    """Per-block encrypt_block/decrypt_block of SpeckCipher and optimized.SpeckCipher"""
+    xs, ys = _random_words(blocks)
+    pairs = list(zip(xs.tolist(), ys.tolist()))
+    results = []
+    with np.errstate(over='ignore'):  # optimized.SpeckCipher's key schedule wraps uint16 scalars
+        legacy = optimized.SpeckCipher(BENCH_KEY)
+    for name, cipher in [('speck_cipher.SpeckCipher', SpeckCipher(BENCH_KEY)),
+                         ('optimized.SpeckCipher', legacy)]:
+        for operation in ('encrypt_block', 'decrypt_block'):
+            method = getattr(cipher, operation)
+            row = {'backend': name, 'operation': operation, 'blocks': blocks}
+            try:
+                with np.errstate(over='ignore'):
+                    row['blocks_per_s'] = _blocks_per_second(
+                        lambda: [method(x, y) for x, y in pairs], blocks, repeats)
+            except (OverflowError, ValueError) as error:
+                # e.g. NumPy 2 rejects its out-of-range Python ints; record instead of aborting
+                row['error'] = f"{type(error).__name__}: {error}"
+            results.append(row)
+    return results
+
+def benchmark_batch(blocks=1 << 20, repeats=3):
+    """encrypt_blocks/decrypt_blocks of every batch backend on the same input"""
+    xs, ys = _random_words(blocks)
+    speck = SpeckCipher(BENCH_KEY)
+    backends = [('SpeckCipher', speck), ('BitslicedSpeck', BitslicedSpeck(BENCH_KEY))]
+    results = []
+    for name, cipher in backends:
+        for operation in ('encrypt_blocks', 'decrypt_blocks'):
+            method = getattr(cipher, operation)
+            rate = _blocks_per_second(lambda: method(xs, ys), blocks, repeats)
+            results.append({'backend': name, 'operation': operation, 'blocks': blocks,
+                            'blocks_per_s': rate})
+
+    # Codebook: 8-bit samples give 256 distinct x values; warm lookups after one build
+    small_xs, small_ys = _random_words(blocks, high=256)
+    with CodebookCipher(speck, max_bytes=256 * 65536 * 4) as codebook:
+        start = time.perf_counter()
+        codebook.encrypt_blocks(small_xs, small_ys)
+        cold = blocks / (time.perf_counter() - start)
+        warm = _blocks_per_second(lambda: codebook.encrypt_blocks(small_xs, small_ys), blocks, repeats)
+    results.append({'backend': 'CodebookCipher', 'operation': 'encrypt_blocks_cold', 'blocks': blocks,
+                    'blocks_per_s': cold})
+    results.append({'backend': 'CodebookCipher', 'operation': 'encrypt_blocks_warm', 'blocks': blocks,
+                    'blocks_per_s': warm})
+    return results
+
+def benchmark_cache_blocking(frames=None, repeats=2):
+    """Chunked vs unchunked batch rounds on full video frames (see speck_cipher)"""
+    return benchmark_chunking(frames=frames, key=BENCH_KEY, repeats=repeats)
+
+if __name__ == "__main__":
+    for row in benchmark_scalar() + benchmark_batch():
+        rate = f"{row['blocks_per_s']:>14,.0f} blocks/s" if 'blocks_per_s' in row else row['error']
+        print(f"{row['backend']:<26} {row['operation']:<22} {rate}")
@@ -0,0 +1,102 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_cipher import benchmark_scalar, benchmark_batch, benchmark_cache_blocking
+from bench_pipeline import benchmark_pipeline
+
+# Rates that drop below this fraction of the baseline are reported as regressions
+DEFAULT_REGRESSION_THRESHOLD = 0.9
+
+# Fields that identify a row across runs. Sizes that vary by machine or --quick
+# (blocks, auto-tuned chunk_blocks, megabytes) are left out so rows still match.
+ROW_KEYS = {
+    'scalar': ('backend', 'operation'),
+    'batch': ('backend', 'operation'),
+    'cache_blocking': ('frame',),
+    'pipeline': ('height', 'width', 'channels', 'streaming', 'mode', 'workers'),
+}
+
+def run_suite(quick=False, workers=1):
+    """Run every benchmark and return one JSON-serializable report"""
+    if quick:
+        cipher_blocks, frames, sizes = 1 << 16, {'4K': (2160, 3840, 3)}, [(256, 256), (1024, 1024)]
+    else:
+        cipher_blocks, frames, sizes = 1 << 20, None, None
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+        },
+        'quick': quick,
+        'scalar': benchmark_scalar(),
+        'batch': benchmark_batch(blocks=cipher_blocks),
+        'cache_blocking': benchmark_cache_blocking(frames=frames),
+        'pipeline': benchmark_pipeline(sizes=sizes, workers=workers),
+    }
+
+def _rates(report):
+    """Flatten a report into {(section, 'field=value'..., metric): rate}"""
+    rates = {}
+    for section, keys in ROW_KEYS.items():
+        for row in report.get(section, []):
+            ident = tuple(f"{k}={row.get(k)}" for k in keys)
+            for metric, value in row.items():
+                if metric.endswith('_per_s'):
+                    rates[(section,) + ident + (metric,)] = value
+    return rates
+
+def compare_reports(report, baseline):
+    """([(name, ratio)] current / baseline for rates in both reports, [names only in the baseline])"""
+    current, previous = _rates(report), _rates(baseline)
+    ratios = [(' '.join(name), current[name] / previous[name])
+              for name in current if name in previous and previous[name] > 0]
+    missing = [' '.join(name) for name in previous if name not in current]
+    return ratios, missing
+
+def main():
+    parser = argparse.ArgumentParser(description="Speck cipher and image pipeline throughput benchmarks")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON report to write")
+    parser.add_argument('--baseline', help="earlier JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="flag rates below this fraction of the baseline")
+    parser.add_argument('--quick', action='store_true', help="smaller inputs for a fast run")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes for the image pipeline")
+    args = parser.parse_args()
+
+    report = run_suite(quick=args.quick, workers=args.workers)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Benchmark results saved as {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        ratios, missing = compare_reports(report, baseline)
+        regressions = 0
+        for name, ratio in ratios:
+            flag = '  <-- regression' if ratio < args.threshold else ''
+            regressions += bool(flag)
+            print(f"{ratio:6.2f}x  {name}{flag}")
+        for name in missing:
+            print(f"   missing  {name}")
+        print(f"{regressions} regression(s) below {args.threshold:.0%} of {args.baseline}, "
+              f"{len(ratios)} rate(s) compared")
+        if missing:
+            print(f"⚠️ {len(missing)} baseline rate(s) have no counterpart in this run")
+        # A baseline that matches nothing must not pass as "no regressions"
+        return 1 if regressions or not ratios else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
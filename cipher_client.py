@@ -0,0 +1,120 @@
+import http.client
+import json
+import os
+import socket
+import sys
+import time
+
+# Standard library only: the client must start fast, the heavy imports live in the daemon
+from cipher_protocol import (DEFAULT_HTTP_PORT, DEFAULT_SOCKET_PATH, HTTP_REQUEST_HEADER,
+                             HTTP_RESPONSE_HEADER, check_socket_owner, encode_message, read_message)
+
+class CipherClient:
+    """Persistent connection to cipher_daemon over its Unix domain socket"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH):
+        self.socket_path = socket_path
+        check_socket_owner(socket_path)  # Pixels and keys must not go to another user's socket
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.stream = self.sock.makefile('rwb')
+
+    def request(self, header, payload=b''):
+        """Send one request and return its (header, payload) response; errors raise RuntimeError"""
+        self.stream.write(encode_message(header, payload))
+        self.stream.flush()
+        message = read_message(self.stream)
+        if message is None:
+            raise ConnectionError("Cipher daemon closed the connection")
+        response, data = message
+        if response.get('status') != 'ok':
+            raise RuntimeError(response.get('error', 'Cipher daemon request failed'))
+        return response, data
+
+    def encrypt_pixels(self, pixels, shape, key=None, mode='ecb', packing='none', nonce=None):
+        """Encrypt raw uint8 pixel bytes of (height, width[, channels]); returns (header, words bytes)"""
+        header = {'op': 'encrypt', 'shape': list(shape), 'mode': mode, 'packing': packing}
+        if key is not None:
+            header['key'] = int(key)
+        if nonce is not None:
+            header['nonce'] = int(nonce)
+        return self.request(header, pixels)
+
+    def decrypt_pixels(self, words, payload_shape, key=None, mode='ecb', packing='none', nonce=0):
+        """Decrypt little-endian uint16 cipher words; returns (header, uint8 pixel bytes)"""
+        header = {'op': 'decrypt', 'payload_shape': list(payload_shape), 'mode': mode,
+                  'packing': packing, 'nonce': int(nonce)}
+        if key is not None:
+            header['key'] = int(key)
+        return self.request(header, words)
+
+    def encrypt_file(self, input_path, output_path, **options):
+        """Have the daemon run encrypt_image on two local paths"""
+        header = dict(options, op='encrypt_file', input=os.path.abspath(input_path),
+                      output=os.path.abspath(output_path))
+        return self.request(header)[0]
+
+    def decrypt_file(self, input_path, output_path, **options):
+        """Have the daemon run decrypt_image on two local paths"""
+        header = dict(options, op='decrypt_file', input=os.path.abspath(input_path),
+                      output=os.path.abspath(output_path))
+        return self.request(header)[0]
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def http_request(header, payload=b'', host='127.0.0.1', port=DEFAULT_HTTP_PORT):
+    """Same request through the daemon's local HTTP stand-in (POST /<op>; ping, encrypt, decrypt with a key)"""
+    connection = http.client.HTTPConnection(host, port)
+    try:
+        fields = {key: value for key, value in header.items() if key != 'op'}
+        connection.request('POST', '/' + header['op'], body=payload,
+                           headers={HTTP_REQUEST_HEADER: json.dumps(fields)})
+        reply = connection.getresponse()
+        data = reply.read()
+        response = json.loads(reply.getheader(HTTP_RESPONSE_HEADER) or '{}')
+    finally:
+        connection.close()
+    if response.get('status') != 'ok':
+        raise RuntimeError(response.get('error', f"HTTP {reply.status}"))
+    return response, data
+
+def main():
+    args = sys.argv[1:]
+    socket_path = DEFAULT_SOCKET_PATH
+    if '--socket' in args:
+        index = args.index('--socket')
+        socket_path = args[index + 1]
+        del args[index:index + 2]
+
+    if not args or args[0] not in ('ping', 'encrypt', 'decrypt') or (args[0] != 'ping' and len(args) < 3):
+        print(f"Usage: python {sys.argv[0]} [--socket path] ping | encrypt <image> <output.bin> "
+              f"| decrypt <input.bin> <output.png>")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        with CipherClient(socket_path) as client:
+            if args[0] == 'ping':
+                response = client.request({'op': 'ping'})[0]
+            elif args[0] == 'encrypt':
+                response = client.encrypt_file(args[1], args[2])
+            else:
+                response = client.decrypt_file(args[1], args[2])
+    except (OSError, RuntimeError, ValueError) as error:
+        print(f"Error: {error}")
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"✅ {args[0]} done in {elapsed * 1000:.1f} ms "
+          f"(daemon {response.get('server_seconds', 0) * 1000:.1f} ms)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
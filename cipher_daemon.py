@@ -0,0 +1,243 @@
+import ipaddress
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from speck_cipher import SpeckCipher, get_t_tables
+from speck_parallel import cipher_image
+from cipher_modes import MODES, random_nonce, reserve_counters
+from encrypted_image_file import pack_payload, unpack_payload
+from speck_encryption import encrypt_image
+from speck_decryption import decrypt_image
+from cipher_protocol import (DEFAULT_HTTP_PORT, DEFAULT_SOCKET_PATH, HTTP_REQUEST_HEADER,
+                             HTTP_RESPONSE_HEADER, check_socket_owner, encode_message, read_message)
+
+# Any local user can reach the TCP port, so HTTP only serves in-memory ops with an
+# explicit key: no file access and no use of the daemon owner's key file
+HTTP_OPS = ('ping', 'encrypt', 'decrypt')
+
+class CipherDaemon:
+    """Long-running cipher state: warm tables and key schedules, optional worker pool"""
+
+    def __init__(self, key_path="encryption_key.npy", workers=1):
+        self.key_path = key_path
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+        self.started = time.time()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        # Pay the one-off costs now instead of on the first request
+        get_t_tables()
+        if os.path.exists(key_path):
+            SpeckCipher(int(np.load(key_path)))  # Fills the round-key LRU cache
+
+    def resolve_key(self, header):
+        """Key from the request ('key' or 'key_path'), else the daemon's default key file"""
+        if 'key' in header:
+            return int(header['key']) & 0xFFFF
+        key_path = header.get('key_path', self.key_path)
+        if not os.path.exists(key_path):
+            raise FileNotFoundError(f"Key file {key_path} not found")
+        return int(np.load(key_path))
+
+    def handle(self, header, payload):
+        """Serve one request; returns the (header, payload) response"""
+        with self._lock:
+            self.requests += 1
+        op = header.get('op')
+        handler = getattr(self, f'op_{op}', None) if isinstance(op, str) else None
+        if handler is None:
+            return {'status': 'error', 'error': f"Unknown operation {op!r}"}, b''
+        try:
+            start = time.perf_counter()
+            response, data = handler(header, payload)
+            response.setdefault('status', 'ok')
+            response['server_seconds'] = time.perf_counter() - start
+            return response, data
+        except Exception as error:
+            return {'status': 'error', 'error': f"{type(error).__name__}: {error}"}, b''
+
+    def op_ping(self, header, payload):
+        return {'uptime': time.time() - self.started, 'requests': self.requests, 'workers': self.workers}, b''
+
+    def _cipher(self, words, key, decrypt, mode, nonce):
+        return cipher_image(words, key, decrypt=decrypt, workers=self.workers, pool=self.pool,
+                            mode=mode, nonce=nonce)
+
+    def op_encrypt(self, header, payload):
+        """Raw (height, width, channels) uint8 pixels -> uint16 little-endian cipher words"""
+        shape = tuple(header['shape'])
+        pixels = np.frombuffer(payload, dtype=np.uint8).reshape(shape)
+        if pixels.ndim == 2:
+            pixels = pixels[:, :, None]
+        # Same even-dimension trim as encrypt_image
+        pixels = pixels[:pixels.shape[0] - pixels.shape[0] % 2, :pixels.shape[1] - pixels.shape[1] % 2]
+        mode, packing = header.get('mode', 'ecb'), header.get('packing', 'none')
+        if mode not in MODES:
+            raise ValueError(f"Unknown cipher mode {mode!r}, expected one of {MODES}")
+        key, words = self.resolve_key(header), pack_payload(pixels, packing)
+        if mode == 'ecb':
+            nonce = 0
+        elif 'nonce' in header:
+            nonce = int(header['nonce'])
+        elif mode == 'ctr' and 'key' not in header:
+            # Keys from a file get CTR counters no other image used (see reserve_counters)
+            nonce = reserve_counters(header.get('key_path', self.key_path), words.size // 2)
+        else:
+            nonce = random_nonce()
+        words = self._cipher(words, key, False, mode, nonce)
+        return ({'shape': list(pixels.shape), 'payload_shape': list(words.shape), 'dtype': '<u2',
+                 'mode': mode, 'nonce': nonce, 'packing': packing}, words.astype('<u2').tobytes())
+
+    def op_decrypt(self, header, payload):
+        """uint16 little-endian cipher words of payload_shape -> raw uint8 pixels"""
+        words = np.frombuffer(payload, dtype='<u2').reshape(tuple(header['payload_shape']))
+        mode = header.get('mode', 'ecb')
+        decrypted = self._cipher(words, self.resolve_key(header), True, mode, int(header.get('nonce', 0)))
+        pixels = unpack_payload(decrypted, header.get('packing', 'none'))
+        return {'shape': list(pixels.shape), 'dtype': 'uint8'}, pixels.tobytes()
+
+    def op_encrypt_file(self, header, payload):
+        """Server-side encrypt_image on paths visible to the daemon"""
+        if not encrypt_image(header['input'], header.get('key_path', self.key_path), header['output'],
+                             workers=self.workers, packing=header.get('packing', 'none'),
+                             mode=header.get('mode', 'ecb')):
+            raise ValueError(f"Could not encrypt {header['input']}")
+        return {'output': header['output']}, b''
+
+    def op_decrypt_file(self, header, payload):
+        """Server-side decrypt_image on paths visible to the daemon"""
+        if not decrypt_image(header['input'], header.get('key_path', self.key_path), header['output'],
+                             workers=self.workers):
+            raise ValueError(f"Could not decrypt {header['input']}")
+        return {'output': header['output']}, b''
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # A connection may carry any number of requests, one response each
+        while True:
+            message = read_message(self.rfile)
+            if message is None:
+                return
+            response, data = self.server.cipher_daemon.handle(*message)
+            self.wfile.write(encode_message(response, data))
+            self.wfile.flush()
+
+class _HttpHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        # POST /<op>: JSON header in X-Speck-Request, raw payload as the body
+        header = json.loads(self.headers.get(HTTP_REQUEST_HEADER) or '{}')
+        header['op'] = self.path.strip('/').split('/')[-1]
+        payload = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if header['op'] not in HTTP_OPS:
+            status, error = 403, f"Operation {header['op']!r} is not served over HTTP"
+        elif header['op'] != 'ping' and 'key' not in header:
+            status, error = 403, "HTTP requests must pass an explicit 'key'"
+        else:
+            status, error = None, None
+        if error is not None:
+            response, data = {'status': 'error', 'error': error}, b''
+        else:
+            header.pop('key_path', None)  # Never read key files on behalf of HTTP clients
+            response, data = self.server.cipher_daemon.handle(header, payload)
+            status = 200 if response['status'] == 'ok' else 400
+        self.send_response(status)
+        self.send_header(HTTP_RESPONSE_HEADER, json.dumps(response))
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep the daemon's console for its own messages
+
+def serve_unix(daemon, socket_path=DEFAULT_SOCKET_PATH):
+    """Unix domain socket server bound to socket_path (call serve_forever on it)"""
+    socket_dir = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    info = os.stat(socket_dir)
+    shared = info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    if info.st_uid != os.getuid() and not (info.st_uid == 0 and (not shared or info.st_mode & stat.S_ISVTX)):
+        raise PermissionError(f"Socket directory {socket_dir} belongs to another user")
+    if os.path.lexists(socket_path):
+        check_socket_owner(socket_path)  # Never delete a regular file or another user's socket
+        os.remove(socket_path)  # Stale socket from an earlier daemon
+    old_umask = os.umask(0o177)  # The socket is created 0600, with no window at wider permissions
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, _UnixHandler)
+    finally:
+        os.umask(old_umask)
+    os.chmod(socket_path, 0o600)  # Only the owning user may connect
+    server.daemon_threads = True  # Idle client connections must not block shutdown
+    server.cipher_daemon = daemon
+    return server
+
+def serve_http(daemon, host='127.0.0.1', port=DEFAULT_HTTP_PORT):
+    """Local-only HTTP stand-in for the gateway (HTTP_OPS only); refuses non-loopback addresses"""
+    if not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"The HTTP stand-in only binds to loopback addresses, got {host}")
+    server = ThreadingHTTPServer((host, port), _HttpHandler)
+    server.daemon_threads = True
+    server.cipher_daemon = daemon
+    return server
+
+def main():
+    args = sys.argv[1:]
+    socket_path = DEFAULT_SOCKET_PATH
+    http_port = None
+    workers = 1
+    key_path = "encryption_key.npy"
+    while args:
+        option = args.pop(0)
+        if option in ('--socket', '--http-port', '--workers', '--key') and not args:
+            print(f"Error: {option} needs a value")
+            return
+        if option == '--socket':
+            socket_path = args.pop(0)
+        elif option == '--http-port':
+            http_port = int(args.pop(0))
+        elif option == '--workers':
+            workers = int(args.pop(0))
+        elif option == '--key':
+            key_path = args.pop(0)
+        else:
+            print(f"Usage: python {sys.argv[0]} [--socket path] [--http-port port] [--workers n] [--key key.npy]")
+            return
+
+    daemon = CipherDaemon(key_path, workers)
+    servers = [serve_unix(daemon, socket_path)]
+    print(f"✅ Cipher daemon listening on {socket_path}")
+    if http_port is not None:
+        servers.append(serve_http(daemon, port=http_port))
+        print(f"   HTTP stand-in on http://127.0.0.1:{http_port}")
+
+    threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            os.remove(socket_path)
+        daemon.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import json
+import os
+import stat
+import struct
+import tempfile
+
+# Wire format shared by cipher_daemon and cipher_client (standard library only,
+# so the client starts without importing numpy, cv2 or the cipher):
+#   4-byte big-endian header length | JSON header | raw payload of header['payload_bytes']
+LENGTH_FORMAT = '>I'
+LENGTH_SIZE = struct.calcsize(LENGTH_FORMAT)
+MAX_HEADER_BYTES = 1 << 20
+
+def _default_socket_path():
+    """Per-user socket path: $XDG_RUNTIME_DIR, else a private speck-<uid> directory in the temp dir"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(tempfile.gettempdir(),
+                                                                     f'speck-{os.getuid()}')
+    return os.path.join(runtime_dir, 'speck_cipher.sock')
+
+# Never a fixed name in a shared directory, which another local user could claim first
+DEFAULT_SOCKET_PATH = os.environ.get('SPECK_SOCKET') or _default_socket_path()
+DEFAULT_HTTP_PORT = 8765
+
+# HTTP stand-in: the JSON header travels in these HTTP headers, the payload in the body
+HTTP_REQUEST_HEADER = 'X-Speck-Request'
+HTTP_RESPONSE_HEADER = 'X-Speck-Response'
+
+def check_socket_owner(socket_path):
+    """Raise unless socket_path is a Unix socket owned by the current user"""
+    info = os.lstat(socket_path)
+    if not stat.S_ISSOCK(info.st_mode):
+        raise ValueError(f"{socket_path} exists and is not a socket")
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"Socket {socket_path} belongs to another user (uid {info.st_uid})")
+
+def encode_message(header, payload=b''):
+    """Frame a JSON header and a raw payload into one message"""
+    header = dict(header, payload_bytes=len(payload))
+    encoded = json.dumps(header).encode('utf-8')
+    return struct.pack(LENGTH_FORMAT, len(encoded)) + encoded + bytes(payload)
+
+def _read_exactly(stream, size):
+    """Read size bytes from a socket file; None on a clean end of stream before any byte"""
+    data = stream.read(size)
+    if not data:
+        return None
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            raise ConnectionError("Connection closed in the middle of a message")
+        data += more
+    return data
+
+def read_message(stream):
+    """Read one (header, payload) message from a binary file object; None at end of stream"""
+    prefix = _read_exactly(stream, LENGTH_SIZE)
+    if prefix is None:
+        return None
+    (length,) = struct.unpack(LENGTH_FORMAT, prefix)
+    if length > MAX_HEADER_BYTES:
+        raise ValueError(f"Message header of {length} bytes exceeds {MAX_HEADER_BYTES}")
+    header = json.loads(_read_exactly(stream, length).decode('utf-8'))
+    size = int(header.get('payload_bytes', 0))
+    payload = _read_exactly(stream, size) if size else b''
+    return header, payload
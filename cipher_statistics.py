@@ -0,0 +1,130 @@
+import math
+import sys
+
+import numpy as np
+from encrypted_image_file import EncryptedImageFile
+
+# Neighbour directions for the adjacent-pixel correlation (same channel only)
+DIRECTIONS = ('horizontal', 'vertical', 'diagonal')
+
+# Words are centred before the correlation sums to keep float64 sums well conditioned
+WORD_OFFSET = 32767.5
+WORD_MAX = 65535
+
+DEFAULT_STRIP_ROWS = 256
+
+def chi_square_p_value(chi_square, dof):
+    """Upper-tail p-value of a chi-square statistic (Wilson-Hilferty normal approximation)"""
+    z = ((chi_square / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+class CipherStatistics:
+    """Single-pass accumulator of cipher-quality statistics over strips of uint16 words"""
+
+    def __init__(self, bins=65536):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)  # Histogram for entropy and chi-square
+        # Per direction: n, sum a, sum b, sum a^2, sum b^2, sum ab
+        self.sums = {direction: np.zeros(6) for direction in DIRECTIONS}
+        self.previous_row = None  # Last row of the previous strip, for vertical/diagonal pairs
+        self.compared = 0  # NPCR/UACI against a second ciphertext
+        self.changed = 0
+        self.abs_difference = 0
+
+    def update(self, strip, other_strip=None):
+        """Add a (rows, width, channels) strip; rows must arrive in order, top to bottom"""
+        strip = np.asarray(strip)
+        if strip.ndim == 2:
+            strip = strip[:, :, None]
+        self.counts += np.bincount(strip.ravel(), minlength=self.bins)
+
+        values = strip.astype(np.float64) - WORD_OFFSET
+        self._accumulate('horizontal', values[:, :-1], values[:, 1:])
+        # Pairs that straddle two strips use the carried-over previous row
+        rows = values if self.previous_row is None else np.concatenate([self.previous_row[None], values])
+        self._accumulate('vertical', rows[:-1], rows[1:])
+        self._accumulate('diagonal', rows[:-1, :-1], rows[1:, 1:])
+        self.previous_row = values[-1].copy()
+
+        if other_strip is not None:
+            other_strip = np.asarray(other_strip).reshape(strip.shape)
+            self.compared += strip.size
+            self.changed += int(np.count_nonzero(strip != other_strip))
+            self.abs_difference += int(np.abs(strip.astype(np.int32) - other_strip.astype(np.int32)).sum())
+
+    def _accumulate(self, direction, a, b):
+        if a.size:
+            self.sums[direction] += [a.size, a.sum(), b.sum(), np.vdot(a, a), np.vdot(b, b), np.vdot(a, b)]
+
+    def correlation(self, direction):
+        """Pearson correlation of neighbouring words in one direction (nan if undefined)"""
+        n, sum_a, sum_b, sum_aa, sum_bb, sum_ab = self.sums[direction]
+        if n < 2:
+            return float('nan')
+        covariance = sum_ab / n - (sum_a / n) * (sum_b / n)
+        variance_a = sum_aa / n - (sum_a / n) ** 2
+        variance_b = sum_bb / n - (sum_b / n) ** 2
+        if variance_a <= 0 or variance_b <= 0:
+            return float('nan')
+        return float(covariance / math.sqrt(variance_a * variance_b))
+
+    def results(self):
+        """Entropy, chi-square uniformity, correlations and (when compared) NPCR/UACI"""
+        total = int(self.counts.sum())
+        probabilities = self.counts[self.counts > 0] / total if total else np.zeros(0)
+        expected = total / self.bins
+        chi_square = float(((self.counts - expected) ** 2).sum() / expected) if total else float('nan')
+        results = {
+            'words': total,
+            'entropy_bits': float(-(probabilities * np.log2(probabilities)).sum()),
+            'max_entropy_bits': math.log2(self.bins),
+            'chi_square': chi_square,
+            'chi_square_dof': self.bins - 1,
+            'chi_square_p': chi_square_p_value(chi_square, self.bins - 1) if total else float('nan'),
+            'correlation': {direction: self.correlation(direction) for direction in DIRECTIONS},
+        }
+        if self.compared:
+            results['npcr_percent'] = 100.0 * self.changed / self.compared
+            results['uaci_percent'] = 100.0 * self.abs_difference / (self.compared * WORD_MAX)
+        return results
+
+def cipher_statistics(encrypted_path, other_path=None, strip_rows=DEFAULT_STRIP_ROWS):
+    """Statistics of an encrypted .bin payload in one memory-mapped pass (NPCR/UACI vs other_path)"""
+    with EncryptedImageFile(encrypted_path) as encrypted_file:
+        other_file = EncryptedImageFile(other_path) if other_path else None
+        try:
+            if other_file is not None and other_file.payload_shape != encrypted_file.payload_shape:
+                raise ValueError(f"Payload shapes differ: {encrypted_file.payload_shape} "
+                                 f"vs {other_file.payload_shape}")
+            statistics = CipherStatistics()
+            for start in range(0, encrypted_file.height, strip_rows):
+                stop = start + strip_rows
+                statistics.update(encrypted_file.data[start:stop],
+                                  other_file.data[start:stop] if other_file is not None else None)
+        finally:
+            if other_file is not None:
+                other_file.close()
+    return statistics.results()
+
+def array_statistics(image, strip_rows=DEFAULT_STRIP_ROWS):
+    """Same statistics for an in-memory image, e.g. the plaintext for comparison"""
+    statistics = CipherStatistics()
+    for start in range(0, image.shape[0], strip_rows):
+        statistics.update(image[start:start + strip_rows])
+    return statistics.results()
+
+def print_statistics(results, title="Ciphertext statistics"):
+    print(f"\n{title}:")
+    print(f"Entropy: {results['entropy_bits']:.4f} bits (max {results['max_entropy_bits']:.0f})")
+    print(f"Chi-square: {results['chi_square']:.1f} with {results['chi_square_dof']} dof "
+          f"(p = {results['chi_square_p']:.4f}, uniform if p > 0.05)")
+    for direction, value in results['correlation'].items():
+        print(f"{direction.capitalize()} correlation: {value:.4f}")
+    if 'npcr_percent' in results:
+        print(f"NPCR: {results['npcr_percent']:.4f}%  UACI: {results['uaci_percent']:.4f}%")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"Usage: python {sys.argv[0]} <encrypted.bin> [<other_encrypted.bin>]")
+    else:
+        print_statistics(cipher_statistics(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
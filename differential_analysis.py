@@ -0,0 +1,309 @@
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+from speck_cipher import SpeckCipher, encrypt_rounds_in_place
+from avalanche_analysis import combine_words, popcount32
+
+WORD_MASK = 0xFFFF
+CARRY_MASK = 0x7FFF  # The MSB carry never affects the sum, so it costs no probability
+ALPHA, BETA = 7, 2  # Rotation amounts of the round: x >>> 7, y <<< 2
+
+# Number of per-round difference distribution rows kept by the LRU cache
+DDT_CACHE_SIZE = 1 << 14
+# Output differences tracked per round by the empirical histogram
+MAX_TRACKED = 1 << 16
+# Free-input searches the CLI runs to bound a fixed-input search (5 rounds take a few seconds)
+FREE_SEARCH_ROUNDS = 5
+
+def ror(value, r):
+    return ((value >> r) | (value << (16 - r))) & WORD_MASK
+
+def rol(value, r):
+    return ((value << r) | (value >> (16 - r))) & WORD_MASK
+
+def addition_outputs(alpha, beta, max_weight):
+    """Every gamma with Lipmaa-Moriai xdp+(alpha, beta -> gamma) of weight <= max_weight, as (gamma, weight).
+
+    Built bit by bit from the LSB: gamma bit 0 is alpha ^ beta, bit i is forced
+    where alpha, beta and gamma agree at bit i - 1 and free (one unit of weight)
+    where they differ, so only the valid outputs are ever visited.
+    """
+    outputs = []
+    stack = [(1, (alpha ^ beta) & 1, 0)]  # (next bit, gamma so far, weight)
+    while stack:
+        bit, gamma, weight = stack.pop()
+        if bit == 16:
+            outputs.append((gamma, weight))
+            continue
+        a, b, g = (alpha >> (bit - 1)) & 1, (beta >> (bit - 1)) & 1, (gamma >> (bit - 1)) & 1
+        if a == b == g:
+            stack.append((bit + 1, gamma | ((((alpha ^ beta) >> bit) ^ b) & 1) << bit, weight))
+        elif weight < max_weight:
+            stack.append((bit + 1, gamma, weight + 1))
+            stack.append((bit + 1, gamma | (1 << bit), weight + 1))
+    return outputs
+
+@lru_cache(maxsize=DDT_CACHE_SIZE)
+def round_differentials(dx, dy, max_weight):
+    """Cached DDT row of one round: every ((dx', dy'), weight) reachable from (dx, dy), lightest first.
+
+    The round key is XORed in after the addition, so it does not change XOR
+    differences: only the addition costs probability.
+    """
+    rotated_dy = rol(dy, BETA)
+    outputs = addition_outputs(ror(dx, ALPHA), dy, max_weight)
+    outputs.sort(key=lambda output: output[1])
+    return tuple(((gamma, rotated_dy ^ gamma), weight) for gamma, weight in outputs)
+
+def addition_triples(max_weight):
+    """Every (alpha, beta, gamma, weight) addition differential of weight <= max_weight.
+
+    Same bit-by-bit construction as addition_outputs, with alpha and beta free
+    as well, expanded one bit at a time over numpy arrays.
+    """
+    alpha, beta, gamma = (np.zeros(1, dtype=np.uint32) for _ in range(3))
+    weight = np.zeros(1, dtype=np.uint8)
+    for bit in range(16):
+        if bit == 0:
+            agree = np.ones(1, dtype=bool)
+            previous_beta = np.zeros(1, dtype=np.uint32)
+        else:
+            a, b, g = ((v >> (bit - 1)) & 1 for v in (alpha, beta, gamma))
+            agree = (a == b) & (b == g)
+            previous_beta = b
+        children = []
+        free = ~agree & (weight < max_weight)
+        for a in (0, 1):
+            for b in (0, 1):
+                # Agreeing rows force the gamma bit, the others branch on it at one unit of weight
+                forced = (np.uint32(a ^ b) ^ previous_beta[agree]) << bit
+                children.append((alpha[agree] | (a << bit), beta[agree] | (b << bit),
+                                 gamma[agree] | forced, weight[agree]))
+                for g in (0, 1):
+                    children.append((alpha[free] | (a << bit), beta[free] | (b << bit),
+                                     gamma[free] | (g << bit), weight[free] + 1))
+        alpha, beta, gamma, weight = (np.concatenate(arrays) for arrays in zip(*children))
+    nonzero = (alpha | beta) != 0
+    return alpha[nonzero], beta[nonzero], gamma[nonzero], weight[nonzero]
+
+def first_round_states(max_weight):
+    """States entering round 2 after a free first round of weight <= max_weight, lightest first.
+
+    Returns (input dx, input dy, dx, dy, weight) arrays, one row per state
+    with its lightest first round.
+    """
+    alpha, beta, gamma, weight = addition_triples(max_weight)
+    dx, dy = gamma, rol(beta, BETA) ^ gamma
+    order = np.argsort(weight, kind='stable')
+    _, first = np.unique(((dx << 16) | dy)[order], return_index=True)
+    keep = order[np.sort(first)]
+    return rol(alpha[keep], ALPHA), beta[keep], dx[keep], dy[keep], weight[keep]
+
+def extend_lower_bounds(best_weights, rounds):
+    """Lower bounds for 0..rounds rounds from best weights of shorter trails (B[a + b] >= B[a] + B[b])"""
+    bounds = list(best_weights[:rounds + 1])
+    while len(bounds) <= rounds:
+        k = len(bounds)
+        bounds.append(max(bounds[a] + bounds[k - a] for a in range(1, k)))
+    return bounds
+
+class TrailSearch:
+    """Matsui-style branch and bound over the rotate/add structure of the round"""
+
+    def __init__(self, rounds, bound, lower_bounds):
+        self.rounds = rounds
+        self.bound = bound  # Trails heavier than this are pruned
+        self.lower_bounds = lower_bounds  # lower_bounds[k]: no k-round trail is lighter
+        self.trail = []
+        self.best = None
+        self.nodes = 0
+
+    def extend(self, dx, dy, weight, round_index):
+        """Depth-first search of rounds round_index.. from state (dx, dy), lightest branch first"""
+        if round_index == self.rounds:
+            self.best = (weight, list(self.trail))
+            self.bound = weight - 1  # Only strictly better trails from here on
+            return
+        remaining = self.lower_bounds[self.rounds - round_index - 1]
+        budget = self.bound - weight - remaining
+        if budget < 0:
+            return
+        for state, round_weight in round_differentials(dx, dy, budget):
+            # Rows are sorted by weight and the bound only shrinks, so stop at the first miss
+            if weight + round_weight + remaining > self.bound:
+                break
+            self.nodes += 1
+            self.trail.append((state, round_weight))
+            self.extend(*state, weight + round_weight, round_index + 1)
+            self.trail.pop()
+
+def search_trail(input_difference, rounds, max_weight=None, best_weights=(0,)):
+    """Highest-probability trail from a fixed (dx, dy) input difference.
+
+    Returns a result like best_trails() entries, with 'trail' a list of
+    ((dx, dy), round weight) for rounds 1..rounds, or None if no trail has
+    weight <= max_weight. Without max_weight the bound starts at the greedy
+    trail (lightest branch every round). best_weights are optimal free-input
+    weights, e.g. from best_trails(); they tighten the pruning.
+    """
+    start = time.perf_counter()
+    if max_weight is None:
+        dx, dy = input_difference
+        max_weight = 0
+        for _ in range(rounds):
+            (dx, dy), weight = round_differentials(dx, dy, 15)[0]
+            max_weight += weight
+    search = TrailSearch(rounds, max_weight, extend_lower_bounds(best_weights, rounds))
+    search.extend(*input_difference, 0, 0)
+    if search.best is None:
+        return None
+    weight, trail = search.best
+    return {'rounds': rounds, 'weight': weight, 'input': tuple(input_difference), 'trail': trail,
+            'nodes': search.nodes, 'seconds': time.perf_counter() - start}
+
+def best_trails(max_rounds, verbose=False):
+    """Optimal free-input trails for 1..max_rounds rounds (Matsui's bound on shorter rounds).
+
+    For each r the bound starts at the best (r - 1)-round weight and grows by one
+    until a trail is found, so the first trail found is optimal. The input
+    difference is free: the first round enumerates addition differentials
+    directly, and every later round prunes with the best shorter-trail weights.
+    That enumeration grows quickly with the weight gap between r - 1 and r
+    rounds (7.5M differentials for a gap of 4), so 6 rounds is the practical
+    limit here; longer trails come from search_trail() with these weights.
+    """
+    best_weights = [0]  # best_weights[k]: best k-round weight, 0 rounds cost nothing
+    trails = []
+    for rounds in range(1, max_rounds + 1):
+        start = time.perf_counter()
+        bound = best_weights[-1]
+        nodes = 0
+        found = None
+        while found is None:
+            search = TrailSearch(rounds, bound, best_weights)
+            input_dx, input_dy, dx, dy, weights = first_round_states(bound - best_weights[rounds - 1])
+            if rounds > 1:
+                # Bits where round 2's addends differ always cost one: drop states that cannot fit
+                minimum = weights + popcount32((ror(dx, ALPHA) ^ dy) & CARRY_MASK) + best_weights[rounds - 2]
+                keep = minimum <= bound
+                input_dx, input_dy, dx, dy, weights = (a[keep] for a in (input_dx, input_dy, dx, dy, weights))
+            for index in range(weights.size):
+                weight = int(weights[index])
+                if weight + best_weights[rounds - 1] > search.bound:
+                    break
+                state = (int(dx[index]), int(dy[index]))
+                search.trail = [(state, weight)]
+                before = search.best
+                search.extend(*state, weight, 1)
+                if search.best is not before:
+                    found = ((int(input_dx[index]), int(input_dy[index])), search.best)
+            nodes += search.nodes + weights.size
+            bound += 1
+        input_difference, (weight, trail) = found
+        best_weights.append(weight)
+        trails.append({'rounds': rounds, 'weight': weight, 'input': input_difference,
+                       'trail': trail, 'nodes': nodes, 'seconds': time.perf_counter() - start})
+        if verbose:
+            print_trail(trails[-1])
+    return trails
+
+def empirical_differentials(key, input_difference, rounds=22, pairs=1 << 22, batch=1 << 18, seed=0,
+                            max_tracked=MAX_TRACKED):
+    """Histogram of output differences after each round 1..rounds for random plaintext pairs.
+
+    Both members of every pair are encrypted together in one (2, batch) array and
+    stepped round by round. Per round, output differences are counted with
+    np.unique/bincount; only the max_tracked most frequent are kept between
+    batches, which leaves the high-probability differences exact.
+    """
+    speck = SpeckCipher(key)
+    rng = np.random.default_rng(seed)
+    dx, dy = (np.uint16(d) for d in input_difference)
+    histograms = [(np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64)) for _ in range(rounds)]
+    for start in range(0, pairs, batch):
+        size = min(batch, pairs - start)
+        x = np.empty((2, size), dtype=np.uint16)
+        y = np.empty((2, size), dtype=np.uint16)
+        x[0] = rng.integers(0, 65536, size, dtype=np.uint16)
+        y[0] = rng.integers(0, 65536, size, dtype=np.uint16)
+        np.bitwise_xor(x[0], dx, out=x[1])
+        np.bitwise_xor(y[0], dy, out=y[1])
+        tmp = np.empty_like(x)
+        for round_index, k in enumerate(speck.round_keys[:rounds]):
+            encrypt_rounds_in_place(x, y, tmp, [k])
+            differences = combine_words(x[0] ^ x[1], y[0] ^ y[1])
+            values, counts = np.unique(differences, return_counts=True)
+            # Merge with the running histogram of this round
+            previous_values, previous_counts = histograms[round_index]
+            merged, inverse = np.unique(np.concatenate([previous_values, values]), return_inverse=True)
+            totals = np.bincount(inverse, weights=np.concatenate([previous_counts, counts]),
+                                 minlength=merged.size).astype(np.int64)
+            if merged.size > max_tracked:
+                keep = np.argpartition(totals, -max_tracked)[-max_tracked:]
+                merged, totals = merged[keep], totals[keep]
+            histograms[round_index] = (merged, totals)
+    return [{'round': round_index + 1, 'differences': values, 'counts': counts, 'pairs': pairs}
+            for round_index, (values, counts) in enumerate(histograms)]
+
+def differential_probability(key, input_difference, output_difference, rounds, pairs=1 << 22,
+                             batch=1 << 18, seed=0):
+    """Fraction of random pairs with input_difference that reach output_difference after rounds"""
+    speck = SpeckCipher(key)
+    rng = np.random.default_rng(seed)
+    hits = 0
+    for start in range(0, pairs, batch):
+        size = min(batch, pairs - start)
+        xs = rng.integers(0, 65536, size, dtype=np.uint16)
+        ys = rng.integers(0, 65536, size, dtype=np.uint16)
+        x = np.stack([xs, xs ^ np.uint16(input_difference[0])])
+        y = np.stack([ys, ys ^ np.uint16(input_difference[1])])
+        x, y = speck.encrypt_blocks(x, y, rounds=rounds)
+        hits += int(np.count_nonzero(((x[0] ^ x[1]) == output_difference[0])
+                                     & ((y[0] ^ y[1]) == output_difference[1])))
+    return hits / pairs
+
+def print_trail(result):
+    dx, dy = result['input']
+    print(f"\n{result['rounds']}-round trail: weight {result['weight']} "
+          f"(p = 2^-{result['weight']}), {result['nodes']:,} nodes in {result['seconds']:.2f}s")
+    print(f"   input  ({dx:04x}, {dy:04x})")
+    for round_index, ((dx, dy), weight) in enumerate(result['trail']):
+        print(f"   round {round_index + 1:>2}  ({dx:04x}, {dy:04x})  weight {weight}")
+
+def print_differentials(histograms, top=3):
+    print(f"\n{'round':>5}  most frequent output differences (dx, dy): log2 probability")
+    for histogram in histograms:
+        order = np.argsort(histogram['counts'])[::-1][:top]
+        entries = [f"({value >> 16:04x}, {value & 0xFFFF:04x}): {np.log2(count / histogram['pairs']):6.2f}"
+                   for value, count in zip(histogram['differences'][order], histogram['counts'][order])]
+        print(f"{histogram['round']:>5}  " + "  ".join(entries))
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    input_difference = None
+    if '--input' in args:
+        index = args.index('--input')
+        input_difference = (int(args[index + 1], 16), int(args[index + 2], 16))
+        del args[index:index + 3]
+    rounds = int(args[0]) if len(args) > 0 else FREE_SEARCH_ROUNDS
+    pairs = int(args[1]) if len(args) > 1 else 1 << 22
+    key = int(np.load("encryption_key.npy"))
+
+    if input_difference is None:
+        trails = best_trails(rounds, verbose=True)
+    else:
+        # Optimal shorter free-input trails bound the fixed-input search
+        free_trails = best_trails(min(rounds - 1, FREE_SEARCH_ROUNDS))
+        trails = [search_trail(input_difference, rounds,
+                               best_weights=[0] + [trail['weight'] for trail in free_trails])]
+        print_trail(trails[0])
+
+    print(f"\nEmpirical check under key {key} with {pairs:,} random pairs:")
+    for result in trails:
+        probability = differential_probability(key, result['input'], result['trail'][-1][0],
+                                               result['rounds'], pairs)
+        measured = f"2^{np.log2(probability):.2f}" if probability else "not observed"
+        print(f"   {result['rounds']:>2} rounds: trail 2^-{result['weight']}, differential {measured}")
+    print_differentials(empirical_differentials(key, trails[-1]['input'], rounds=22, pairs=pairs))
@@ -0,0 +1,218 @@
+import os
+import struct
+import numpy as np
+
+# Legacy v1 header written in front of the uint16 payload: width, height, channels
+HEADER_FORMAT = 'III'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)  # 12 bytes
+
+# v2 header: magic, version, flags, dimensions, cipher parameters, block
+# layout, nonce and chunking, followed by a table of chunk byte offsets
+V2_MAGIC = b'SPK2'
+V2_HEADER_FORMAT = '<4sHHIIIBBBBBBBBIIIQ'
+V2_HEADER_SIZE = struct.calcsize(V2_HEADER_FORMAT)  # 48 bytes
+V2_ALIGNMENT = 16  # Payload offset alignment
+
+# Default number of rows (whole row pairs) per chunk in v2 files
+DEFAULT_CHUNK_ROWS = 64
+
+# On-disk codes for the v2 header fields
+DTYPE_CODES = {'uint16': 1}
+CIPHER_CODES = {'speck32': 1}  # Speck with 16-bit words, 16-bit key
+SPECK_ROUNDS = 22  # The only round count SpeckCipher implements
+MODE_CODES = {'ecb': 0, 'ctr': 1, 'cbc': 2}  # See cipher_modes
+PACKING_CODES = {'none': 0, 'pack8': 1}  # pack8: two 8-bit samples per word
+LAYOUT_CODES = {'row_pairs': 0}  # Block = (row i, row i+1) in one column
+
+def _decode(codes, value, field):
+    """Map an on-disk code back to its name, rejecting unknown values"""
+    for name, code in codes.items():
+        if code == value:
+            return name
+    raise ValueError(f"Unsupported {field} code {value} in encrypted file header")
+
+def chunk_offsets(data_offset, chunk_rows, row_bytes, height):
+    """Byte offset of every chunk when chunks are stored back to back"""
+    n_chunks = -(-height // chunk_rows)
+    return data_offset + chunk_rows * row_bytes * np.arange(n_chunks, dtype=np.uint64)
+
+def payload_width(width, packing):
+    """Number of uint16 words per row and channel for a given packing"""
+    return width // 2 if packing == 'pack8' else width
+
+def pack_payload(image, packing='none'):
+    """Turn (height, width, channels) 8-bit samples into the uint16 words that get encrypted"""
+    image = np.asarray(image)
+    if packing == 'pack8':
+        # Horizontal neighbours share a word, so a (row i, row i+1) block covers 2x2 samples
+        return (image[:, 0::2].astype(np.uint16) << 8) | image[:, 1::2].astype(np.uint16)
+    return image.astype(np.uint16)
+
+def unpack_payload(words, packing='none'):
+    """Turn decrypted uint16 words back into (height, width, channels) 8-bit samples"""
+    words = np.asarray(words)
+    if packing == 'pack8':
+        samples = np.empty((words.shape[0], words.shape[1] * 2) + words.shape[2:], dtype=np.uint8)
+        samples[:, 0::2] = words >> 8
+        samples[:, 1::2] = words & 0xFF
+        return samples
+    return words.astype(np.uint8)
+
+def write_header(f, width, height, channels):
+    """Write the legacy v1 (width, height, channels) header to an open binary file"""
+    f.write(struct.pack(HEADER_FORMAT, width, height, channels))
+
+class EncryptedImageFile:
+    """Encrypted .bin image whose pixels are exposed as a zero-copy np.memmap"""
+
+    def __init__(self, path, mode='r'):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic = f.read(4)
+            f.seek(0)
+            if magic == V2_MAGIC:
+                self._read_v2_header(f)
+            else:
+                self._read_v1_header(f)
+
+        # Extra trailing data is ignored, but a short payload cannot be mapped
+        payload_size = os.path.getsize(path) - self.data_offset
+        if payload_size < self.nbytes:
+            raise ValueError(f"Encrypted file {path} is truncated: expected {self.nbytes} "
+                             f"payload bytes, got {payload_size}")
+
+        # (height, words per row, channels) view of the uint16 payload, paged in on demand
+        self.data = np.memmap(path, dtype=np.uint16, mode=mode, offset=self.data_offset,
+                              shape=self.payload_shape)
+
+    def _read_v1_header(self, f):
+        """Legacy layout: bare 'III' header, one contiguous ECB payload"""
+        self.version = 1
+        header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE:
+            raise ValueError(f"Encrypted file {self.path} is too short for a header: "
+                             f"expected {HEADER_SIZE} bytes, got {len(header)}")
+        self.width, self.height, self.channels = struct.unpack(HEADER_FORMAT, header)
+        self.cipher, self.rounds, self.cipher_mode, self.packing = 'speck32', SPECK_ROUNDS, 'ecb', 'none'
+        self.nonce = 0
+        self.data_offset = HEADER_SIZE
+        self.chunk_rows = max(self.height, 1)
+        self.chunk_offsets = np.array([HEADER_SIZE], dtype=np.uint64)
+
+    def _read_v2_header(self, f):
+        header = f.read(V2_HEADER_SIZE)
+        if len(header) != V2_HEADER_SIZE:
+            raise ValueError(f"Encrypted file {self.path} is too short for a v2 header: "
+                             f"expected {V2_HEADER_SIZE} bytes, got {len(header)}")
+        (_, self.version, _, self.width, self.height, self.channels,
+         dtype_code, cipher_code, word_bits, key_bits, self.rounds, mode_code, packing_code,
+         layout_code, self.nonce, self.chunk_rows, n_chunks, self.data_offset) = struct.unpack(
+            V2_HEADER_FORMAT, header)
+        if self.version != 2:
+            raise ValueError(f"Unsupported encrypted file version {self.version}")
+        if self.chunk_rows <= 0 or self.chunk_rows % 2 != 0:
+            # Chunks hold whole row pairs; 0 would also divide by zero in chunk_offsets
+            raise ValueError(f"Invalid chunk_rows {self.chunk_rows} in {self.path}, "
+                             f"expected a positive even number")
+
+        _decode(DTYPE_CODES, dtype_code, 'dtype')
+        _decode(LAYOUT_CODES, layout_code, 'block layout')
+        self.cipher = _decode(CIPHER_CODES, cipher_code, 'cipher')
+        self.cipher_mode = _decode(MODE_CODES, mode_code, 'cipher mode')
+        self.packing = _decode(PACKING_CODES, packing_code, 'packing')
+        if (word_bits, key_bits) != (16, 16):
+            raise ValueError(f"Unsupported Speck parameters: {word_bits}-bit words, {key_bits}-bit key")
+        if self.rounds != SPECK_ROUNDS:
+            raise ValueError(f"Unsupported Speck round count {self.rounds}, expected {SPECK_ROUNDS}")
+
+        self.chunk_offsets = np.frombuffer(f.read(8 * n_chunks), dtype='<u8').astype(np.uint64)
+        expected = chunk_offsets(self.data_offset, self.chunk_rows, self.row_bytes, self.height)
+        if not np.array_equal(self.chunk_offsets, expected):
+            raise ValueError(f"Chunk offset table of {self.path} does not match its chunk layout")
+
+    @classmethod
+    def create(cls, path, width, height, channels, chunk_rows=DEFAULT_CHUNK_ROWS, version=2,
+               packing='none', cipher_mode='ecb', nonce=0):
+        """Create a zero-filled encrypted image file and open it for writing"""
+        if packing not in PACKING_CODES or (packing == 'pack8' and width % 2 != 0):
+            raise ValueError(f"Unsupported packing {packing!r} for width {width}")
+        if cipher_mode not in MODE_CODES:
+            raise ValueError(f"Unsupported cipher mode {cipher_mode!r}")
+        if version == 1 and (packing, cipher_mode) != ('none', 'ecb'):
+            raise ValueError("Legacy v1 files only support unpacked samples in ECB mode")
+        if version == 1:
+            with open(path, 'wb') as f:
+                write_header(f, width, height, channels)
+                f.truncate(HEADER_SIZE + width * height * channels * 2)
+            return cls(path, mode='r+')
+
+        if chunk_rows <= 0 or chunk_rows % 2 != 0:
+            raise ValueError(f"chunk_rows must be a positive even number, got {chunk_rows}")
+
+        # Chunks are laid out back to back after the header and offset table
+        n_chunks = -(-height // chunk_rows)
+        table_end = V2_HEADER_SIZE + 8 * n_chunks
+        data_offset = -(-table_end // V2_ALIGNMENT) * V2_ALIGNMENT
+        row_bytes = payload_width(width, packing) * channels * 2
+        offsets = chunk_offsets(data_offset, chunk_rows, row_bytes, height)
+
+        with open(path, 'wb') as f:
+            f.write(struct.pack(
+                V2_HEADER_FORMAT, V2_MAGIC, 2, 0, width, height, channels,
+                DTYPE_CODES['uint16'], CIPHER_CODES['speck32'], 16, 16, SPECK_ROUNDS,
+                MODE_CODES[cipher_mode], PACKING_CODES[packing], LAYOUT_CODES['row_pairs'],
+                nonce, chunk_rows, n_chunks, data_offset))
+            f.write(offsets.astype('<u8').tobytes())
+            f.truncate(data_offset + row_bytes * height)
+        return cls(path, mode='r+')
+
+    @property
+    def shape(self):
+        return (self.height, self.width, self.channels)
+
+    @property
+    def payload_shape(self):
+        return (self.height, payload_width(self.width, self.packing), self.channels)
+
+    @property
+    def row_bytes(self):
+        return payload_width(self.width, self.packing) * self.channels * 2
+
+    @property
+    def nbytes(self):
+        return self.height * self.row_bytes
+
+    @property
+    def n_chunks(self):
+        return len(self.chunk_offsets)
+
+    def chunk_bounds(self, index):
+        """(start_row, stop_row) of chunk `index`"""
+        start = index * self.chunk_rows
+        return start, min(start + self.chunk_rows, self.height)
+
+    def read_chunk(self, index):
+        """Memory-mapped rows of one chunk"""
+        start, stop = self.chunk_bounds(index)
+        return self.data[start:stop]
+
+    def write_chunk(self, index, rows):
+        """Store the rows of one chunk; chunks can be written in any order"""
+        start, stop = self.chunk_bounds(index)
+        self.data[start:stop] = rows
+
+    def flush(self):
+        """Write pending changes of a writable file back to disk"""
+        if self.data is not None and self.data.mode != 'r':
+            self.data.flush()
+
+    def close(self):
+        """Flush and release the memory map"""
+        self.flush()
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
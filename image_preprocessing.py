@@ -1,79 +1,102 @@
-"""import cv2
-import numpy as np
-
-def preprocess_image(input_path, output_path):
-    image = cv2.imread(input_path, cv2.IMREAD_COLOR)
-    if image is None:
-        print("Error: Could not load image.")
-        return
-    image = cv2.resize(image, (256, 256))  # Resizing to a fixed size
-    cv2.imwrite(output_path, image)
-    print(f"Preprocessed image saved as {output_path}")
-
-preprocess_image("D:\DAA_Project\image.png", "processed_image.png")"""
-"""import cv2
-import numpy as np
-
-def preprocess_image(input_path, output_path):
-    image = cv2.imread(input_path, cv2.IMREAD_GRAYSCALE)  # Convert to grayscale
-    if image is None:
-        print("Error: Could not load image.")
-        return
-
-    image = cv2.resize(image, (128, 128))  # Resize to fixed size
-    cv2.imwrite(output_path, image)
-    print(f"Preprocessed image saved as {output_path}")
-
-preprocess_image("image.png", "processed_image.png")"""
-
-
-"""
-import cv2
-import numpy as np
-
-def preprocess_image(input_path, output_path):
-    # Read the image
-    image = cv2.imread(input_path, cv2.IMREAD_GRAYSCALE)  # Changed to grayscale to match encryption
-    if image is None:
-        print(f"Error: Could not load image from {input_path}")
-        return
-    
-    # Ensure dimensions are even for proper pair-wise processing
-    height, width = 256, 256
-    image = cv2.resize(image, (width, height))
-    
-    # Save the preprocessed image
-    cv2.imwrite(output_path, image)
-    print(f"Preprocessed image saved as {output_path}")
-
-if __name__ == "__main__":
-    preprocess_image("image.png", "processed_image.png")
-"""
-
-import cv2
-import numpy as np
-
-def preprocess_image(input_path, output_path):
-    # Read the image in color
-    image = cv2.imread(input_path, cv2.IMREAD_COLOR)
-    if image is None:
-        print(f"Error: Could not load image from {input_path}")
-        return
-    
-    # Resize image to 256x256
-    image = cv2.resize(image, (256, 256))
-    
-    # Ensure dimensions are even for proper pair-wise processing
-    height, width, channels = image.shape
-    if height % 2 != 0:
-        image = image[:-1, :, :]
-    if width % 2 != 0:
-        image = image[:, :-1, :]
-    
-    # Save the preprocessed image
-    cv2.imwrite(output_path, image)
-    print(f"Preprocessed color image saved as {output_path}")
-    return image
-
-if __name__ == "__main__":
+"""import cv2
+import numpy as np
+
+def preprocess_image(input_path, output_path):
+    image = cv2.imread(input_path, cv2.IMREAD_COLOR)
+    if image is None:
+        print("Error: Could not load image.")
+        return
+    image = cv2.resize(image, (256, 256))  # Resizing to a fixed size
+    cv2.imwrite(output_path, image)
+    print(f"Preprocessed image saved as {output_path}")
+
+preprocess_image("D:\DAA_Project\image.png", "processed_image.png")"""
+"""import cv2
+import numpy as np
+
+def preprocess_image(input_path, output_path):
+    image = cv2.imread(input_path, cv2.IMREAD_GRAYSCALE)  # Convert to grayscale
+    if image is None:
+        print("Error: Could not load image.")
+        return
+
+    image = cv2.resize(image, (128, 128))  # Resize to fixed size
+    cv2.imwrite(output_path, image)
+    print(f"Preprocessed image saved as {output_path}")
+
+preprocess_image("image.png", "processed_image.png")"""
+
+
+"""
+import cv2
+import numpy as np
+
+def preprocess_image(input_path, output_path):
+    # Read the image
+    image = cv2.imread(input_path, cv2.IMREAD_GRAYSCALE)  # Changed to grayscale to match encryption
+    if image is None:
+        print(f"Error: Could not load image from {input_path}")
+        return
+    
+    # Ensure dimensions are even for proper pair-wise processing
+    height, width = 256, 256
+    image = cv2.resize(image, (width, height))
+    
+    # Save the preprocessed image
+    cv2.imwrite(output_path, image)
+    print(f"Preprocessed image saved as {output_path}")
+
+if __name__ == "__main__":
+    preprocess_image("image.png", "processed_image.png")
+"""
+
+import cv2
+import numpy as np
+
+def preprocess_image(input_path, output_path):
+    # Read the image in color
+    image = cv2.imread(input_path, cv2.IMREAD_COLOR)
+    if image is None:
+        print(f"Error: Could not load image from {input_path}")
+        return
+    
+    # Resize image to 256x256
+    image = cv2.resize(image, (256, 256))
+    
+    # Ensure dimensions are even for proper pair-wise processing
+    height, width, channels = image.shape
+    if height % 2 != 0:
+        image = image[:-1, :, :]
+    if width % 2 != 0:
+        image = image[:, :-1, :]
+    
+    # Save the preprocessed image
+    cv2.imwrite(output_path, image)
+    print(f"Preprocessed color image saved as {output_path}")
+    return image
+
+def open_image_source(image_path):
+    """Open an 8-bit image as a (height, width, channels) uint8 array for strip-wise reading.
+
+    The cipher payload holds 8-bit samples only, so .npy sources of any other
+    dtype (e.g. 12/16-bit scans or floats) are rejected with ValueError
+    instead of being truncated.
+    """
+    if image_path.endswith('.npy'):
+        # Memory-mapped, so slicing a strip only reads that strip from disk
+        image = np.load(image_path, mmap_mode='r')
+        if image.dtype != np.uint8:
+            raise ValueError(f"{image_path} has dtype {image.dtype}; only 8-bit (uint8) images are supported")
+    else:
+        # Compressed formats (PNG, JPEG, ...) are decoded in full by OpenCV
+        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+        if image is None:
+            print(f"Error: Could not load image from {image_path}")
+            return None
+    
+    if image.ndim == 2:
+        image = image[:, :, np.newaxis]
+    return image
+
+if __name__ == "__main__":
     preprocess_image("image.png", "processed_image.png")
\ No newline at end of file
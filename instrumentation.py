@@ -0,0 +1,84 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+def file_bytes(*paths):
+    """Total size of the given files, ignoring ones that do not exist"""
+    return sum(os.path.getsize(path) for path in paths if path and os.path.exists(path))
+
+class Instrumentation:
+    """Per-stage wall time, CPU time, bytes in/out and block counters for a pipeline run"""
+
+    def __init__(self, namespace='speck'):
+        self.namespace = namespace  # Prefix of the Prometheus metric names
+        self.stages = []  # One record per stage run, in execution order
+
+    @contextmanager
+    def stage(self, name, bytes_in=0, blocks=0):
+        """Time one stage; set record['bytes_out'] / record['blocks'] inside the block"""
+        record = {'stage': name, 'bytes_in': int(bytes_in), 'bytes_out': 0, 'blocks': int(blocks)}
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            # CPU time is this process only; worker processes are not included
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = time.process_time() - cpu_start
+            self.stages.append(record)
+
+    def totals(self):
+        """Stage records summed by stage name (a stage may run more than once)"""
+        totals = {}
+        for record in self.stages:
+            total = totals.setdefault(record['stage'], {'runs': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                                                        'bytes_in': 0, 'bytes_out': 0, 'blocks': 0})
+            total['runs'] += 1
+            for field in ('wall_seconds', 'cpu_seconds', 'bytes_in', 'bytes_out', 'blocks'):
+                total[field] += record[field]
+        return totals
+
+    def report(self):
+        """Structured report: every stage run plus per-stage totals and their share of wall time"""
+        totals = self.totals()
+        wall_total = sum(total['wall_seconds'] for total in totals.values())
+        for total in totals.values():
+            total['wall_share'] = total['wall_seconds'] / wall_total if wall_total else 0.0
+        return {'stages': list(self.stages), 'totals': totals, 'wall_seconds': wall_total}
+
+    def prometheus(self):
+        """Per-stage totals in the Prometheus text exposition format"""
+        metrics = [
+            ('stage_runs_total', 'runs', 'Number of times each pipeline stage ran'),
+            ('stage_wall_seconds_total', 'wall_seconds', 'Wall-clock time spent in each pipeline stage'),
+            ('stage_cpu_seconds_total', 'cpu_seconds', 'CPU time of this process in each pipeline stage'),
+            ('stage_bytes_in_total', 'bytes_in', 'Bytes read by each pipeline stage'),
+            ('stage_bytes_out_total', 'bytes_out', 'Bytes written by each pipeline stage'),
+            ('stage_blocks_total', 'blocks', 'Cipher blocks processed by each pipeline stage'),
+        ]
+        totals = self.totals()
+        lines = []
+        for metric, field, description in metrics:
+            name = f"{self.namespace}_{metric}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            for stage, total in totals.items():
+                lines.append(f'{name}{{stage="{stage}"}} {total[field]}')
+        return "\n".join(lines) + "\n"
+
+    def save(self, path):
+        """Write the report as JSON, or as Prometheus text when path ends with .prom"""
+        with open(path, 'w') as f:
+            if path.endswith('.prom'):
+                f.write(self.prometheus())
+            else:
+                json.dump(self.report(), f, indent=2)
+
+    def print_summary(self):
+        """Print a per-stage timing table"""
+        report = self.report()
+        print(f"\n{'Stage':<12} {'Wall s':>9} {'CPU s':>9} {'Share':>7} {'In KB':>10} {'Out KB':>10} {'Blocks':>10}")
+        for stage, total in report['totals'].items():
+            print(f"{stage:<12} {total['wall_seconds']:>9.3f} {total['cpu_seconds']:>9.3f} "
+                  f"{total['wall_share']:>7.1%} {total['bytes_in'] / 1024:>10.1f} "
+                  f"{total['bytes_out'] / 1024:>10.1f} {total['blocks']:>10}")
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from speck_cipher import SpeckCipher, encrypt_rounds_in_place
+from cipher_modes import block_counters, chain_ivs, split_words
+from encrypted_image_file import EncryptedImageFile, pack_payload
+from image_preprocessing import open_image_source
+from speck_encryption import load_image_for_encryption
+
+KEY_SPACE = 1 << 16  # SpeckCipher keys are np.uint16
+DEFAULT_SHARD_KEYS = 4096  # Keys per pool task; a (4096 x blocks) batch stays in cache
+DEFAULT_FILTER_BLOCKS = 2  # A 32-bit block leaves ~2^-16 false keys, two leave ~none
+
+def known_pairs(image_path, encrypted_path, max_blocks=64):
+    """(in_x, in_y, out_x, out_y) raw Speck input/output words from a plaintext image and its .bin.
+
+    ECB blocks are used directly. For CTR the input is the counter and the output
+    the keystream (ciphertext ^ plaintext); for CBC the input is plaintext ^ previous
+    ciphertext block. Only the first row pairs needed for max_blocks are read.
+    """
+    with EncryptedImageFile(encrypted_path) as encrypted_file:
+        height, width, channels = encrypted_file.payload_shape
+        pairs = min(height // 2, -(-max_blocks // (width * channels)))
+        cipher = np.array(encrypted_file.data[:2 * pairs])
+        mode, nonce, packing = encrypted_file.cipher_mode, encrypted_file.nonce, encrypted_file.packing
+        full_shape = encrypted_file.shape
+
+    # encrypt_image resizes to 256x256; streamed files keep the source resolution
+    image = open_image_source(image_path)
+    if image is None:
+        raise ValueError(f"Could not load image from {image_path}")
+    if image.shape[:2] != full_shape[:2]:
+        image = load_image_for_encryption(image_path)
+    if image is None or image.shape[:2] != full_shape[:2] or image.shape[2] != channels:
+        raise ValueError(f"{image_path} does not match the {full_shape} image in {encrypted_path}")
+    plain = pack_payload(image[:2 * pairs], packing)
+
+    px, py = plain[0::2], plain[1::2]
+    cx, cy = cipher[0::2], cipher[1::2]
+    if mode == 'ecb':
+        in_x, in_y, out_x, out_y = px, py, cx, cy
+    elif mode == 'ctr':
+        counters = block_counters(nonce, np.arange(pairs), np.arange(width), np.arange(channels), width, channels)
+        in_x, in_y = split_words(counters)
+        out_x, out_y = cx ^ px, cy ^ py
+    else:  # cbc: every row pair is one chain over (column, channel)
+        iv_x, iv_y = chain_ivs(nonce, np.arange(pairs))
+        cx, cy, px, py = (a.reshape(pairs, -1) for a in (cx, cy, px, py))
+        prev_x = np.concatenate([iv_x[:, None], cx[:, :-1]], axis=1)
+        prev_y = np.concatenate([iv_y[:, None], cy[:, :-1]], axis=1)
+        in_x, in_y, out_x, out_y = px ^ prev_x, py ^ prev_y, cx, cy
+    return tuple(np.asarray(a, dtype=np.uint16).reshape(-1)[:max_blocks] for a in (in_x, in_y, out_x, out_y))
+
+def _search_shard(task):
+    """Worker: keys [start, stop) against a few blocks as one (keys x blocks) batch"""
+    start, stop, in_x, in_y, out_x, out_y = task
+    keys = np.arange(start, stop)
+    # (rounds, keys, 1) round keys broadcast over the blocks of each row
+    schedules = SpeckCipher.schedules_for(keys).T[:, :, None]
+    x = np.repeat(in_x[None], keys.size, axis=0)
+    y = np.repeat(in_y[None], keys.size, axis=0)
+    encrypt_rounds_in_place(x, y, np.empty_like(x), schedules)
+    matches = ((x == out_x) & (y == out_y)).all(axis=1)
+    return keys[matches].tolist()
+
+def search_keys(in_x, in_y, out_x, out_y, workers=None, shard_keys=DEFAULT_SHARD_KEYS,
+                filter_blocks=DEFAULT_FILTER_BLOCKS):
+    """Test all 65536 keys on known pairs, sharded across a process pool"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Filter on distinct input blocks (repeated blocks carry no extra information)
+    blocks = (in_x.astype(np.uint32) << 16) | in_y
+    _, first_seen = np.unique(blocks, return_index=True)
+    chosen = np.sort(first_seen)[:filter_blocks]
+    filter_words = (in_x[chosen], in_y[chosen], out_x[chosen], out_y[chosen])
+
+    start_time = time.perf_counter()
+    tasks = [(start, min(start + shard_keys, KEY_SPACE)) + filter_words
+             for start in range(0, KEY_SPACE, shard_keys)]
+    if workers == 1:
+        shards = map(_search_shard, tasks)
+        candidates = [key for shard in shards for key in shard]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            candidates = [key for shard in pool.map(_search_shard, tasks) for key in shard]
+    search_time = time.perf_counter() - start_time
+
+    # Survivors of the filter are checked against every known pair
+    recovered = []
+    for key in candidates:
+        ex, ey = SpeckCipher(key).encrypt_blocks(in_x, in_y)
+        if np.array_equal(ex, out_x) and np.array_equal(ey, out_y):
+            recovered.append(key)
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        'recovered_keys': recovered,
+        'candidates': candidates,
+        'known_blocks': int(in_x.size),
+        'filter_blocks': int(chosen.size),
+        'workers': workers,
+        'seconds': elapsed,
+        'keys_per_s': KEY_SPACE / search_time if search_time else float('inf'),
+    }
+
+def audit_key_search(image_path="processed_image.png", encrypted_path="encrypted_image.bin",
+                     workers=None, known_blocks=64):
+    """Known-plaintext audit: recover the key of an encrypted image and time the search"""
+    for path in [image_path, encrypted_path]:
+        if not os.path.exists(path):
+            print(f"Error: File {path} not found")
+            return
+    pairs = known_pairs(image_path, encrypted_path, known_blocks)
+    result = search_keys(*pairs, workers=workers)
+
+    print(f"Known-plaintext key search over all {KEY_SPACE:,} keys")
+    print(f"   Known blocks: {result['known_blocks']} ({result['filter_blocks']} used to filter), "
+          f"Workers: {result['workers']}")
+    print(f"   Speed: {result['keys_per_s']:,.0f} keys/s, total {result['seconds'] * 1000:.1f} ms")
+    if result['recovered_keys']:
+        print(f"⚠️ Recovered key(s): {', '.join(str(k) for k in result['recovered_keys'])}")
+    else:
+        print("No key matches every known pair")
+    return result
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    workers = None
+    if '--workers' in args:
+        index = args.index('--workers')
+        workers = int(args[index + 1])
+        del args[index:index + 2]
+    image = args[0] if len(args) > 0 else "processed_image.png"
+    encrypted = args[1] if len(args) > 1 else "encrypted_image.bin"
+    audit_key_search(image, encrypted, workers)
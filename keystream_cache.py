@@ -0,0 +1,69 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+from cipher_modes import ctr_keystream
+
+class KeystreamCache:
+    """LRU cache of CTR keystreams keyed by (key, nonce, first pair, shape), bounded in bytes"""
+
+    def __init__(self, max_bytes=256 * 2**20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory  # Optional folder of memory-mapped .npy keystreams
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # cache key -> (2, pairs, ...) uint16 keystream
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, cache_key):
+        key, nonce, first_pair, shape = cache_key
+        dims = 'x'.join(str(n) for n in shape)
+        return os.path.join(self.directory, f"ks_{key:04x}_{nonce:08x}_{first_pair}_{dims}.npy")
+
+    def keystream(self, speck, nonce, first_pair, shape):
+        """(ks_x, ks_y) covering pair arrays of `shape` that start at row pair first_pair"""
+        # NOTE: a keystream must never encrypt two different images; reuse is
+        # only safe for re-encrypting the same data or for decryption
+        cache_key = (int(speck.key), int(nonce), int(first_pair), tuple(shape))
+        if cache_key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(cache_key)
+            keystream = self._entries[cache_key]
+            return keystream[0], keystream[1]
+
+        self.misses += 1
+        path = self._path(cache_key) if self.directory else None
+        if path and os.path.exists(path):
+            # Computed by an earlier run: map it instead of running the rounds again
+            keystream = np.load(path, mmap_mode='r')
+        else:
+            blocks_per_pair = int(np.prod(shape[1:], dtype=np.int64))
+            counters = nonce + first_pair * blocks_per_pair + np.arange(int(np.prod(shape)), dtype=np.uint64)
+            keystream = np.stack(ctr_keystream(speck, counters.reshape(shape)))
+            if path:
+                np.save(path, keystream)
+                keystream = np.load(path, mmap_mode='r')
+
+        self._store(cache_key, keystream)
+        return keystream[0], keystream[1]
+
+    def _store(self, cache_key, keystream):
+        """Insert an entry, evicting least recently used ones to stay within max_bytes"""
+        if keystream.nbytes > self.max_bytes:
+            return  # Larger than the whole budget: hand it back without caching
+        self._entries[cache_key] = keystream
+        self.current_bytes += keystream.nbytes
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+
+    def clear(self):
+        """Drop every in-memory entry (files in `directory` are kept)"""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,240 +1,384 @@
-"""import numpy as np
-import warnings
-
-class SpeckCipher:
-    def __init__(self, key):
-        self.key = np.uint16(key)  # Ensure 16-bit key
-        self.round_keys = self.key_schedule()
-
-    def key_schedule(self):
-        l = [self.key]
-        round_keys = []
-        for i in range(22):  # Speck-16/32 has 22 rounds
-            round_keys.append(l[i])
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", RuntimeWarning)
-                l.append(np.uint16((self.right_rotate(l[i], 7) + round_keys[i]) & 0xFFFF) ^ i)
-        return round_keys
-
-    def right_rotate(self, x, r):
-        return np.uint16((x >> r) | ((x << (16 - r)) & 0xFFFF))  # Ensuring 16-bit result
-
-    def encrypt_block(self, x, y):
-        x, y = np.uint16(x), np.uint16(y)  # Ensure 16-bit input
-        for k in self.round_keys:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", RuntimeWarning)
-                x = np.uint16((self.right_rotate(x, 7) + y) & 0xFFFF) ^ k
-            y = self.right_rotate(y, 2) ^ x
-        return x, y
-
-    def decrypt_block(self, x, y):
-        x, y = np.uint16(x), np.uint16(y)  # Ensure 16-bit input
-        for k in reversed(self.round_keys):
-            y = self.right_rotate(y ^ x, 2)
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", RuntimeWarning)
-                x = np.uint16((self.right_rotate(x, 9) - y) & 0xFFFF) ^ k
-        return x, y"""
-"""
-import numpy as np
-import warnings
-
-warnings.simplefilter("ignore", RuntimeWarning)  # Ignore overflow warnings
-
-class SPECKCipher:
-    def __init__(self, key):
-        self.key = np.uint16(key).item()  # Ensure the key is a scalar
-        self.round_keys = self.expand_key()
-
-    def right_rotate(self, x, r):
-        return ((x >> r) | (x << (16 - r))) & 0xFFFF  # Ensure 16-bit operation
-
-    def expand_key(self):
-        round_keys = [self.key]
-        l = [self.key]
-        for i in range(1, 22):  # 22 rounds for Speck-32/64
-            temp = ((self.right_rotate(l[i-1], 7) + round_keys[i-1]) & 0xFFFF) ^ i
-            l.append(temp)
-            round_keys.append(self.right_rotate(round_keys[i-1], 2) ^ l[i])
-        return round_keys
-
-    def encrypt_block(self, x, y):
-        # Convert numpy values to Python integers
-        x = int(np.uint16(x).item())
-        y = int(np.uint16(y).item())
-
-        for k in self.round_keys:
-            x = ((self.right_rotate(x, 7) + y) & 0xFFFF) ^ k
-            y = self.right_rotate(y, 2) ^ x
-
-        return x, y  # Return pure Python integers
-
-    def decrypt_block(self, x, y):
-        x = int(np.uint16(x).item())
-        y = int(np.uint16(y).item())
-
-        for k in reversed(self.round_keys):
-            y = self.right_rotate(y ^ x, 14)
-            x = ((x ^ k) - y) & 0xFFFF
-
-        return x, y
-"""
-
-
-"""
-
-import numpy as np
-
-class SpeckCipher:
-    def __init__(self, key):
-        self.key = np.uint16(key)  # Ensure 16-bit key
-        self.rounds = 22  # Speck-16/32 has 22 rounds
-        self.round_keys = self.key_schedule()
-
-    def key_schedule(self):
-        l = [self.key]
-        round_keys = []
-        
-        for i in range(self.rounds):
-            round_keys.append(np.uint16(l[i]))
-            # Calculate next round key
-            rotated = self.right_rotate(l[i], 7)
-            # Handle overflow correctly with explicit modulo
-            added = (int(rotated) + int(round_keys[i])) % 65536
-            l.append(np.uint16(added ^ i))
-            
-        return round_keys
-
-    def right_rotate(self, x, r):
-        x = int(x) & 0xFFFF  # Ensure 16-bit value
-        return np.uint16(((x >> r) | (x << (16 - r))) & 0xFFFF)
-    
-    def left_rotate(self, x, r):
-        x = int(x) & 0xFFFF  # Ensure 16-bit value
-        return np.uint16(((x << r) | (x >> (16 - r))) & 0xFFFF)
-
-    def encrypt_block(self, x, y):
-        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
-        
-        for k in self.round_keys:
-            # SPECK round function
-            # Handle addition with explicit modulo to avoid overflow
-            rotated_x = self.right_rotate(x, 7)
-            x = (int(rotated_x) + int(y)) % 65536
-            x = x ^ int(k)
-            y = int(self.left_rotate(y, 2)) ^ int(x)
-            
-            # Convert back to uint16
-            x, y = np.uint16(x), np.uint16(y)
-            
-        return x, y
-
-    def decrypt_block(self, x, y):
-        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
-        
-        for k in reversed(self.round_keys):
-            # Convert to integer for calculations to avoid overflow
-            k = int(k)
-            
-            # Inverse SPECK round function
-            prev_y = int(y) ^ int(x)
-            prev_y = int(self.right_rotate(prev_y, 2))
-            
-            prev_x = int(x) ^ k
-            prev_x = (prev_x - prev_y) % 65536  # Use modulo for correct subtraction
-            prev_x = int(self.left_rotate(prev_x, 7))
-            
-            x, y = np.uint16(prev_x), np.uint16(prev_y)
-            
-        return x, y"""
-import numpy as np
-
-class SpeckCipher:
-    def __init__(self, key):
-        self.key = np.uint16(key)  # Ensure 16-bit key
-        self.rounds = 22  # Speck-16/32 has 22 rounds
-        self.round_keys = self.key_schedule()
-        
-        # Generate T-tables for the full 16-bit space
-        self.t_tables = self.generate_t_tables()
-
-    def key_schedule(self):
-        """Generate round keys for the SPECK cipher"""
-        l = [self.key]
-        round_keys = []
-        
-        for i in range(self.rounds):
-            round_keys.append(np.uint16(l[i]))
-            # Calculate next round key (using original ARX for key schedule)
-            rotated = self.right_rotate(l[i], 7)
-            added = (int(rotated) + int(round_keys[i])) % 65536
-            l.append(np.uint16(added ^ i))
-            
-        return round_keys
-    
-    def right_rotate(self, x, r):
-        """Rotate right by r bits within 16-bit space"""
-        x = int(x) & 0xFFFF  # Ensure 16-bit value
-        return np.uint16(((x >> r) | (x << (16 - r))) & 0xFFFF)
-    
-    def left_rotate(self, x, r):
-        """Rotate left by r bits within 16-bit space"""
-        x = int(x) & 0xFFFF  # Ensure 16-bit value
-        return np.uint16(((x << r) | (x >> (16 - r))) & 0xFFFF)
-    
-    def generate_t_tables(self):
-        """Generate T-tables for all rounds"""
-        # Create a table for each operation needed
-        t_rotate_right7 = {}  # x >>> 7
-        t_rotate_left2 = {}   # y <<< 2
-        t_rotate_right2 = {}  # y >>> 2
-        t_rotate_left7 = {}   # x <<< 7
-        
-        # Precompute all possible values (for 16-bit inputs)
-        for i in range(65536):
-            t_rotate_right7[i] = int(self.right_rotate(i, 7))
-            t_rotate_left2[i] = int(self.left_rotate(i, 2))
-            t_rotate_right2[i] = int(self.right_rotate(i, 2))
-            t_rotate_left7[i] = int(self.left_rotate(i, 7))
-        
-        return {
-            'right7': t_rotate_right7,
-            'left2': t_rotate_left2,
-            'right2': t_rotate_right2,
-            'left7': t_rotate_left7
-        }
-
-    def encrypt_block(self, x, y):
-        """Encrypt a pair of 16-bit values using T-tables"""
-        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
-        
-        for k in self.round_keys:
-            # Use T-tables for rotations
-            rotated_x = self.t_tables['right7'][x]
-            # Still need to do addition and XOR
-            x = (rotated_x + y) % 65536
-            x = x ^ int(k)
-            
-            # Use T-table for rotation
-            rotated_y = self.t_tables['left2'][y]
-            y = rotated_y ^ x
-            
-        return np.uint16(x), np.uint16(y)
-
-    def decrypt_block(self, x, y):
-        """Decrypt a pair of 16-bit values using T-tables"""
-        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
-        
-        for k in reversed(self.round_keys):
-            # Inverse SPECK round function with T-tables
-            prev_y = y ^ x
-            prev_y = self.t_tables['right2'][prev_y]
-            
-            prev_x = x ^ int(k)
-            prev_x = (prev_x - prev_y) % 65536
-            prev_x = self.t_tables['left7'][prev_x]
-            
-            x, y = prev_x, prev_y
-            
-        return np.uint16(x), np.uint16(y)
\ No newline at end of file
+"""import numpy as np
+import warnings
+
+class SpeckCipher:
+    def __init__(self, key):
+        self.key = np.uint16(key)  # Ensure 16-bit key
+        self.round_keys = self.key_schedule()
+
+    def key_schedule(self):
+        l = [self.key]
+        round_keys = []
+        for i in range(22):  # Speck-16/32 has 22 rounds
+            round_keys.append(l[i])
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                l.append(np.uint16((self.right_rotate(l[i], 7) + round_keys[i]) & 0xFFFF) ^ i)
+        return round_keys
+
+    def right_rotate(self, x, r):
+        return np.uint16((x >> r) | ((x << (16 - r)) & 0xFFFF))  # Ensuring 16-bit result
+
+    def encrypt_block(self, x, y):
+        x, y = np.uint16(x), np.uint16(y)  # Ensure 16-bit input
+        for k in self.round_keys:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                x = np.uint16((self.right_rotate(x, 7) + y) & 0xFFFF) ^ k
+            y = self.right_rotate(y, 2) ^ x
+        return x, y
+
+    def decrypt_block(self, x, y):
+        x, y = np.uint16(x), np.uint16(y)  # Ensure 16-bit input
+        for k in reversed(self.round_keys):
+            y = self.right_rotate(y ^ x, 2)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                x = np.uint16((self.right_rotate(x, 9) - y) & 0xFFFF) ^ k
+        return x, y"""
+"""
+import numpy as np
+import warnings
+
+warnings.simplefilter("ignore", RuntimeWarning)  # Ignore overflow warnings
+
+class SPECKCipher:
+    def __init__(self, key):
+        self.key = np.uint16(key).item()  # Ensure the key is a scalar
+        self.round_keys = self.expand_key()
+
+    def right_rotate(self, x, r):
+        return ((x >> r) | (x << (16 - r))) & 0xFFFF  # Ensure 16-bit operation
+
+    def expand_key(self):
+        round_keys = [self.key]
+        l = [self.key]
+        for i in range(1, 22):  # 22 rounds for Speck-32/64
+            temp = ((self.right_rotate(l[i-1], 7) + round_keys[i-1]) & 0xFFFF) ^ i
+            l.append(temp)
+            round_keys.append(self.right_rotate(round_keys[i-1], 2) ^ l[i])
+        return round_keys
+
+    def encrypt_block(self, x, y):
+        # Convert numpy values to Python integers
+        x = int(np.uint16(x).item())
+        y = int(np.uint16(y).item())
+
+        for k in self.round_keys:
+            x = ((self.right_rotate(x, 7) + y) & 0xFFFF) ^ k
+            y = self.right_rotate(y, 2) ^ x
+
+        return x, y  # Return pure Python integers
+
+    def decrypt_block(self, x, y):
+        x = int(np.uint16(x).item())
+        y = int(np.uint16(y).item())
+
+        for k in reversed(self.round_keys):
+            y = self.right_rotate(y ^ x, 14)
+            x = ((x ^ k) - y) & 0xFFFF
+
+        return x, y
+"""
+
+
+"""
+
+import numpy as np
+
+class SpeckCipher:
+    def __init__(self, key):
+        self.key = np.uint16(key)  # Ensure 16-bit key
+        self.rounds = 22  # Speck-16/32 has 22 rounds
+        self.round_keys = self.key_schedule()
+
+    def key_schedule(self):
+        l = [self.key]
+        round_keys = []
+        
+        for i in range(self.rounds):
+            round_keys.append(np.uint16(l[i]))
+            # Calculate next round key
+            rotated = self.right_rotate(l[i], 7)
+            # Handle overflow correctly with explicit modulo
+            added = (int(rotated) + int(round_keys[i])) % 65536
+            l.append(np.uint16(added ^ i))
+            
+        return round_keys
+
+    def right_rotate(self, x, r):
+        x = int(x) & 0xFFFF  # Ensure 16-bit value
+        return np.uint16(((x >> r) | (x << (16 - r))) & 0xFFFF)
+    
+    def left_rotate(self, x, r):
+        x = int(x) & 0xFFFF  # Ensure 16-bit value
+        return np.uint16(((x << r) | (x >> (16 - r))) & 0xFFFF)
+
+    def encrypt_block(self, x, y):
+        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
+        
+        for k in self.round_keys:
+            # SPECK round function
+            # Handle addition with explicit modulo to avoid overflow
+            rotated_x = self.right_rotate(x, 7)
+            x = (int(rotated_x) + int(y)) % 65536
+            x = x ^ int(k)
+            y = int(self.left_rotate(y, 2)) ^ int(x)
+            
+            # Convert back to uint16
+            x, y = np.uint16(x), np.uint16(y)
+            
+        return x, y
+
+    def decrypt_block(self, x, y):
+        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
+        
+        for k in reversed(self.round_keys):
+            # Convert to integer for calculations to avoid overflow
+            k = int(k)
+            
+            # Inverse SPECK round function
+            prev_y = int(y) ^ int(x)
+            prev_y = int(self.right_rotate(prev_y, 2))
+            
+            prev_x = int(x) ^ k
+            prev_x = (prev_x - prev_y) % 65536  # Use modulo for correct subtraction
+            prev_x = int(self.left_rotate(prev_x, 7))
+            
+            x, y = np.uint16(prev_x), np.uint16(prev_y)
+            
+        return x, y"""
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+# Number of distinct (key, rounds) schedules kept by the round-key LRU cache
+KEY_SCHEDULE_CACHE_SIZE = 1024
+
+# uint16 shift amounts for the in-place batch rounds
+TWO, SEVEN, NINE, FOURTEEN = (np.uint16(n) for n in (2, 7, 9, 14))
+
+# Batch rounds run chunk by chunk so that x, y and the scratch array of one
+# chunk (6 bytes per block) stay in the L2 cache for all 22 rounds
+FALLBACK_L2_BYTES = 1 * 2**20
+BYTES_PER_BLOCK = 6
+
+@lru_cache(maxsize=None)
+def l2_cache_bytes():
+    """Size of the L2 cache of CPU 0 (Linux sysfs, read once), or FALLBACK_L2_BYTES if unknown"""
+    cache_dir = '/sys/devices/system/cpu/cpu0/cache'
+    try:
+        for index in sorted(os.listdir(cache_dir)):
+            with open(os.path.join(cache_dir, index, 'level')) as f:
+                if f.read().strip() != '2':
+                    continue
+            with open(os.path.join(cache_dir, index, 'size')) as f:
+                size = f.read().strip().upper()
+            units = {'K': 2**10, 'M': 2**20}
+            return int(size[:-1]) * units[size[-1]] if size[-1] in units else int(size)
+    except (OSError, ValueError):
+        pass
+    return FALLBACK_L2_BYTES
+
+def auto_chunk_blocks():
+    """Blocks per chunk whose working set fills about half of the L2 cache"""
+    return max(4096, l2_cache_bytes() // 2 // BYTES_PER_BLOCK)
+
+# Rotation T-tables for the full 16-bit space, shared by every SpeckCipher
+_T_TABLES = None
+
+def get_t_tables():
+    """Return the shared rotation T-tables, building them on first use"""
+    global _T_TABLES
+    if _T_TABLES is None:
+        values = np.arange(65536, dtype=np.uint16)
+        tables = {
+            'right7': (values >> 7) | (values << 9),   # x >>> 7
+            'left2': (values << 2) | (values >> 14),   # y <<< 2
+            'right2': (values >> 2) | (values << 14),  # y >>> 2
+            'left7': (values << 7) | (values >> 9)     # x <<< 7
+        }
+        # Tables are shared between instances, so guard them against writes
+        for table in tables.values():
+            table.flags.writeable = False
+        _T_TABLES = tables
+    return _T_TABLES
+
+@lru_cache(maxsize=KEY_SCHEDULE_CACHE_SIZE)
+def _cached_round_keys(key, rounds):
+    """Expand a single key once and keep its read-only round keys in the LRU cache"""
+    round_keys = SpeckCipher.schedules_for([key], rounds)[0]
+    round_keys.flags.writeable = False
+    return round_keys
+
+class SpeckCipher:
+    def __init__(self, key, chunk_blocks=None):
+        self.key = np.uint16(key)  # Ensure 16-bit key
+        self.rounds = 22  # Speck-16/32 has 22 rounds
+        self.round_keys = self.key_schedule()
+
+        # Blocks per cache-sized chunk in encrypt_blocks/decrypt_blocks (None: tune to L2)
+        self.chunk_blocks = auto_chunk_blocks() if chunk_blocks is None else int(chunk_blocks)
+        if self.chunk_blocks <= 0:
+            raise ValueError(f"chunk_blocks must be positive, got {chunk_blocks}")
+        
+        # Shared T-tables for the full 16-bit space (built once per process)
+        self.t_tables = self.generate_t_tables()
+
+    def key_schedule(self):
+        """Generate round keys for the SPECK cipher (served from the LRU cache)"""
+        return _cached_round_keys(int(self.key), self.rounds)
+
+    @staticmethod
+    def schedules_for(keys, rounds=22):
+        """Expand many 16-bit keys at once into a (n_keys, rounds) uint16 array"""
+        l = np.asarray(keys).astype(np.uint16).reshape(-1)
+        round_keys = np.empty((l.size, rounds), dtype=np.uint16)
+        
+        for i in range(rounds):
+            round_keys[:, i] = l
+            # Calculate next round key (using original ARX for key schedule)
+            l = (((l >> 7) | (l << 9)) + l) ^ np.uint16(i)
+            
+        return round_keys
+    
+    def right_rotate(self, x, r):
+        """Rotate right by r bits within 16-bit space"""
+        x = int(x) & 0xFFFF  # Ensure 16-bit value
+        return np.uint16(((x >> r) | (x << (16 - r))) & 0xFFFF)
+    
+    def left_rotate(self, x, r):
+        """Rotate left by r bits within 16-bit space"""
+        x = int(x) & 0xFFFF  # Ensure 16-bit value
+        return np.uint16(((x << r) | (x >> (16 - r))) & 0xFFFF)
+    
+    def generate_t_tables(self):
+        """Return the uint16 T-tables for all rounds (shared, not rebuilt per key)"""
+        # Each table is a 65536-entry uint16 array, so it also works as a
+        # NumPy fancy-index lookup, e.g. t_tables['right7'][xs]
+        return get_t_tables()
+
+    def encrypt_block(self, x, y):
+        """Encrypt a pair of 16-bit values using T-tables"""
+        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
+        
+        for k in self.round_keys:
+            # Use T-tables for rotations
+            rotated_x = int(self.t_tables['right7'][x])
+            # Still need to do addition and XOR
+            x = (rotated_x + y) % 65536
+            x = x ^ int(k)
+            
+            # Use T-table for rotation
+            rotated_y = int(self.t_tables['left2'][y])
+            y = rotated_y ^ x
+            
+        return np.uint16(x), np.uint16(y)
+
+    def decrypt_block(self, x, y):
+        """Decrypt a pair of 16-bit values using T-tables"""
+        x, y = int(x) & 0xFFFF, int(y) & 0xFFFF
+        
+        for k in reversed(self.round_keys):
+            # Inverse SPECK round function with T-tables
+            prev_y = y ^ x
+            prev_y = int(self.t_tables['right2'][prev_y])
+            
+            prev_x = x ^ int(k)
+            prev_x = (prev_x - prev_y) % 65536
+            prev_x = int(self.t_tables['left7'][prev_x])
+            
+            x, y = prev_x, prev_y
+            
+        return np.uint16(x), np.uint16(y)
+
+    def encrypt_blocks(self, xs, ys, rounds=None):
+        """Encrypt arrays of 16-bit (x, y) pairs, all rounds per cache-sized chunk"""
+        # Work on C-contiguous uint16 copies so the caller's arrays are left untouched
+        # (and the flat chunk views below really alias them); together with one
+        # chunk of scratch they are the only buffers allocated
+        x = np.array(xs, dtype=np.uint16, order='C')
+        y = np.array(ys, dtype=np.uint16, order='C')
+        # Reduced-round analysis: rounds=r applies only the first r rounds
+        self._run_chunked(encrypt_rounds_in_place, x, y, self.round_keys[:rounds])
+        return x, y
+
+    def decrypt_blocks(self, xs, ys):
+        """Decrypt arrays of 16-bit (x, y) pairs, all rounds per cache-sized chunk"""
+        x = np.array(xs, dtype=np.uint16, order='C')
+        y = np.array(ys, dtype=np.uint16, order='C')
+        self._run_chunked(decrypt_rounds_in_place, x, y, self.round_keys)
+        return x, y
+
+    def _run_chunked(self, apply_rounds, x, y, round_keys):
+        """Apply an in-place round function to consecutive chunks of x and y"""
+        flat_x, flat_y = x.reshape(-1), y.reshape(-1)  # Views: x and y are fresh contiguous copies
+        tmp = np.empty(min(flat_x.size, self.chunk_blocks), dtype=np.uint16)
+        for start in range(0, flat_x.size, self.chunk_blocks):
+            stop = min(start + self.chunk_blocks, flat_x.size)
+            apply_rounds(flat_x[start:stop], flat_y[start:stop], tmp[:stop - start], round_keys)
+
+def encrypt_rounds_in_place(x, y, tmp, round_keys):
+    """Run the given rounds over uint16 buffers x, y in place, with tmp as scratch.
+
+    Each round key may be a scalar or an array broadcasting against x, so one
+    call can encrypt the same blocks under many keys at once.
+    """
+    for k in round_keys:
+        # x = ((x >>> 7) + y) ^ k
+        np.right_shift(x, SEVEN, out=tmp)
+        np.left_shift(x, NINE, out=x)
+        np.bitwise_or(x, tmp, out=x)
+        np.add(x, y, out=x)  # uint16 arithmetic wraps mod 2^16
+        np.bitwise_xor(x, k, out=x)
+        # y = (y <<< 2) ^ x
+        np.right_shift(y, FOURTEEN, out=tmp)
+        np.left_shift(y, TWO, out=y)
+        np.bitwise_or(y, tmp, out=y)
+        np.bitwise_xor(y, x, out=y)
+
+def decrypt_rounds_in_place(x, y, tmp, round_keys):
+    """Inverse of encrypt_rounds_in_place for the same round keys"""
+    for k in reversed(round_keys):
+        # y = (y ^ x) >>> 2
+        np.bitwise_xor(y, x, out=y)
+        np.right_shift(y, TWO, out=tmp)
+        np.left_shift(y, FOURTEEN, out=y)
+        np.bitwise_or(y, tmp, out=y)
+        # x = ((x ^ k) - y) <<< 7
+        np.bitwise_xor(x, k, out=x)
+        np.subtract(x, y, out=x)
+        np.right_shift(x, NINE, out=tmp)
+        np.left_shift(x, SEVEN, out=x)
+        np.bitwise_or(x, tmp, out=x)
+
+def benchmark_chunking(frames=None, key=0x1234, repeats=2):
+    """Blocks per second with and without cache blocking on full video frames"""
+    if frames is None:
+        frames = {'4K': (2160, 3840, 3), '8K': (4320, 7680, 3)}
+    rng = np.random.default_rng(0)
+    results = []
+    for name, shape in frames.items():
+        # One block per (row pair, column, channel), as in cipher_image
+        pairs_shape = (shape[0] // 2,) + shape[1:]
+        xs = rng.integers(0, 256, pairs_shape, dtype=np.uint16)
+        ys = rng.integers(0, 256, pairs_shape, dtype=np.uint16)
+        row = {'frame': name, 'blocks': xs.size}
+        for label, chunk_blocks in (('unchunked', xs.size), ('chunked', None)):
+            cipher = SpeckCipher(key, chunk_blocks=chunk_blocks)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                cipher.encrypt_blocks(xs, ys)
+            row[f'{label}_blocks_per_s'] = xs.size * repeats / (time.perf_counter() - start)
+        row['chunk_blocks'] = SpeckCipher(key).chunk_blocks
+        results.append(row)
+    return results
+
+if __name__ == "__main__":
+    print(f"L2 cache: {l2_cache_bytes() // 1024} KB, auto chunk: {auto_chunk_blocks():,} blocks")
+    for row in benchmark_chunking():
+        print(f"{row['frame']}: {row['blocks']:,} blocks | unchunked {row['unchunked_blocks_per_s']:,.0f}/s "
+              f"| chunked {row['chunked_blocks_per_s']:,.0f}/s "
+              f"({row['chunked_blocks_per_s'] / row['unchunked_blocks_per_s']:.2f}x)")
@@ -1,205 +1,302 @@
-"""import numpy as np
-import cv2
-
-def speck_decrypt(image, key):
-    return image ^ key  # XOR decryption (same as encryption)
-
-def decrypt_image(image_path, key_path, output_path):
-    encrypted_image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-    key = np.load(key_path + ".npy")
-    decrypted_image = speck_decrypt(encrypted_image, key)
-    cv2.imwrite(output_path, decrypted_image)
-    print(f"Decrypted image saved as {output_path}")
-
-decrypt_image("encrypted_image.png", "encryption_key", "decrypted_image.png")
-"""
-"""import numpy as np
-import cv2
-from speck_cipher import SpeckCipher
-
-def decrypt_image(image_path, key_path, output_path):
-    key = np.load(key_path)
-    speck = SpeckCipher(key)
-
-    # Read binary file as uint16
-    encrypted_data = np.fromfile(image_path, dtype=np.uint16)
-
-    # Debugging size check
-    expected_size = 256 * 256
-    print(f"🔍 Expected size: {expected_size}, Read size: {encrypted_data.size}")
-
-    if encrypted_data.size != expected_size:
-        raise ValueError(f"File size mismatch: Expected {expected_size}, got {encrypted_data.size}")
-
-    encrypted_image = encrypted_data.reshape((256, 256))
-
-    decrypted_image = np.zeros_like(encrypted_image, dtype=np.uint16)
-    
-    for i in range(0, encrypted_image.shape[0] - 1, 2):
-        for j in range(encrypted_image.shape[1]):
-            decrypted_image[i, j], decrypted_image[i+1, j] = speck.decrypt_block(encrypted_image[i, j], encrypted_image[i+1, j])
-
-    # Convert back to uint8 (scale down)
-    decrypted_image = (decrypted_image / 257).astype(np.uint8)
-
-    cv2.imwrite(output_path, decrypted_image)
-    print(f"✅ Decrypted image saved as {output_path}")
-
-decrypt_image("encrypted_image.bin", "encryption_key.npy", "decrypted_image.png")
-"""
-"""import numpy as np
-import cv2
-from speck_cipher import SPECKCipher
-
-def decrypt_image(image_path, key_path, output_path):
-    encrypted_image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if encrypted_image is None:
-        raise ValueError("Error: Could not load encrypted image.")
-
-    key = np.load(key_path)
-    speck = SPECKCipher(key)
-
-    reshaped_encrypted = encrypted_image.reshape(-1, 2).astype(np.uint16)  # Convert to 16-bit words
-    left, right = reshaped_encrypted[:, 0], reshaped_encrypted[:, 1]
-    decrypted_left, decrypted_right = speck.decrypt_block(left, right)
-
-    decrypted_image = np.column_stack((decrypted_left, decrypted_right)).reshape(256, 256).astype(np.uint8)
-    cv2.imwrite(output_path, decrypted_image)
-
-    print(f"Decrypted image saved as {output_path}")
-
-decrypt_image("encrypted_image.png", "encryption_key.npy", "decrypted_image.png")
-"""
-
-
-"""
-import numpy as np
-import cv2
-from speck_cipher import SpeckCipher
-import os
-import struct
-
-def decrypt_image(encrypted_path, key_path, output_path):
-    # Load key
-    if not os.path.exists(key_path):
-        print(f"Error: Key file {key_path} not found")
-        return
-    key = np.load(key_path)
-    print(f"Using decryption key: {key}")
-    
-    # Load encrypted image from binary file
-    if not os.path.exists(encrypted_path):
-        print(f"Error: Encrypted file {encrypted_path} not found")
-        return
-    
-    # Read binary file
-    with open(encrypted_path, 'rb') as f:
-        # Read header information
-        width, height = struct.unpack('II', f.read(8))
-        print(f"Image dimensions: {width}x{height}")
-        
-        # Read pixel data
-        encrypted_data = np.fromfile(f, dtype=np.uint16)
-        
-    # Reshape data to 2D array
-    if len(encrypted_data) != width * height:
-        print(f"Warning: Data size mismatch. Expected {width*height}, got {len(encrypted_data)}")
-        # Adjust if needed
-        encrypted_data = encrypted_data[:width*height]
-    
-    encrypted_image = encrypted_data.reshape((height, width))
-    print(f"Encrypted image shape: {encrypted_image.shape}")
-    
-    # Initialize SPECK cipher with the key
-    speck = SpeckCipher(key)
-
-    # Create output array
-    decrypted_image = np.zeros_like(encrypted_image, dtype=np.uint16)
-    
-    # Decrypt each pair of pixels
-    for i in range(0, height - 1, 2):
-        for j in range(width):
-            try:
-                decrypted_image[i, j], decrypted_image[i+1, j] = speck.decrypt_block(
-                    int(encrypted_image[i, j]), int(encrypted_image[i+1, j])
-                )
-            except Exception as e:
-                print(f"Error decrypting at position ({i}, {j}): {e}")
-
-    # Convert back to uint8 for saving as an image
-    decrypted_image_uint8 = decrypted_image.astype(np.uint8)
-    
-    # Save the decrypted image
-    cv2.imwrite(output_path, decrypted_image_uint8)
-    
-    # Debug: Save different versions of the image to help diagnose issues
-    cv2.imwrite(output_path + ".raw.png", decrypted_image)
-    
-    print(f"✅ Decrypted image saved as {output_path}")
-    print(f"   Debug version saved as {output_path}.raw.png")
-    print(f"   Shape: {decrypted_image.shape}, Min: {decrypted_image.min()}, Max: {decrypted_image.max()}")"""
-
-
-import numpy as np
-import cv2
-from speck_cipher import SpeckCipher
-import os
-import struct
-
-def decrypt_image(encrypted_path, key_path, output_path):
-    # Load key
-    if not os.path.exists(key_path):
-        print(f"Error: Key file {key_path} not found")
-        return
-    key = np.load(key_path)
-    print(f"Using decryption key: {key}")
-    
-    # Load encrypted image from binary file
-    if not os.path.exists(encrypted_path):
-        print(f"Error: Encrypted file {encrypted_path} not found")
-        return
-    
-    # Read binary file
-    with open(encrypted_path, 'rb') as f:
-        # Read header information (now includes channels)
-        width, height, channels = struct.unpack('III', f.read(12))
-        print(f"Image dimensions: {width}x{height}x{channels}")
-        
-        # Read pixel data
-        encrypted_data = np.fromfile(f, dtype=np.uint16)
-        
-    # Reshape data to 3D array
-    if len(encrypted_data) != width * height * channels:
-        print(f"Warning: Data size mismatch. Expected {width*height*channels}, got {len(encrypted_data)}")
-        # Adjust if needed
-        encrypted_data = encrypted_data[:width*height*channels]
-    
-    encrypted_image = encrypted_data.reshape((height, width, channels))
-    print(f"Encrypted image shape: {encrypted_image.shape}")
-    
-    # Initialize SPECK cipher with the key
-    speck = SpeckCipher(key)
-
-    # Create output array
-    decrypted_image = np.zeros_like(encrypted_image, dtype=np.uint16)
-    
-    # Decrypt each color channel separately
-    for c in range(channels):
-        # Decrypt each pair of pixels in this channel
-        for i in range(0, height - 1, 2):
-            for j in range(width):
-                try:
-                    decrypted_image[i, j, c], decrypted_image[i+1, j, c] = speck.decrypt_block(
-                        int(encrypted_image[i, j, c]), int(encrypted_image[i+1, j, c])
-                    )
-                except Exception as e:
-                    print(f"Error decrypting at position ({i}, {j}, {c}): {e}")
-
-    # Convert back to uint8 for saving as an image
-    decrypted_image_uint8 = decrypted_image.astype(np.uint8)
-    
-    # Save the decrypted image
-    cv2.imwrite(output_path, decrypted_image_uint8)
-    
-    print(f"✅ Decrypted color image saved as {output_path}")
-    print(f"   Shape: {decrypted_image.shape}, Min: {decrypted_image.min()}, Max: {decrypted_image.max()}")
+"""import numpy as np
+import cv2
+
+def speck_decrypt(image, key):
+    return image ^ key  # XOR decryption (same as encryption)
+
+def decrypt_image(image_path, key_path, output_path):
+    encrypted_image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    key = np.load(key_path + ".npy")
+    decrypted_image = speck_decrypt(encrypted_image, key)
+    cv2.imwrite(output_path, decrypted_image)
+    print(f"Decrypted image saved as {output_path}")
+
+decrypt_image("encrypted_image.png", "encryption_key", "decrypted_image.png")
+"""
+"""import numpy as np
+import cv2
+from speck_cipher import SpeckCipher
+
+def decrypt_image(image_path, key_path, output_path):
+    key = np.load(key_path)
+    speck = SpeckCipher(key)
+
+    # Read binary file as uint16
+    encrypted_data = np.fromfile(image_path, dtype=np.uint16)
+
+    # Debugging size check
+    expected_size = 256 * 256
+    print(f"🔍 Expected size: {expected_size}, Read size: {encrypted_data.size}")
+
+    if encrypted_data.size != expected_size:
+        raise ValueError(f"File size mismatch: Expected {expected_size}, got {encrypted_data.size}")
+
+    encrypted_image = encrypted_data.reshape((256, 256))
+
+    decrypted_image = np.zeros_like(encrypted_image, dtype=np.uint16)
+    
+    for i in range(0, encrypted_image.shape[0] - 1, 2):
+        for j in range(encrypted_image.shape[1]):
+            decrypted_image[i, j], decrypted_image[i+1, j] = speck.decrypt_block(encrypted_image[i, j], encrypted_image[i+1, j])
+
+    # Convert back to uint8 (scale down)
+    decrypted_image = (decrypted_image / 257).astype(np.uint8)
+
+    cv2.imwrite(output_path, decrypted_image)
+    print(f"✅ Decrypted image saved as {output_path}")
+
+decrypt_image("encrypted_image.bin", "encryption_key.npy", "decrypted_image.png")
+"""
+"""import numpy as np
+import cv2
+from speck_cipher import SPECKCipher
+
+def decrypt_image(image_path, key_path, output_path):
+    encrypted_image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if encrypted_image is None:
+        raise ValueError("Error: Could not load encrypted image.")
+
+    key = np.load(key_path)
+    speck = SPECKCipher(key)
+
+    reshaped_encrypted = encrypted_image.reshape(-1, 2).astype(np.uint16)  # Convert to 16-bit words
+    left, right = reshaped_encrypted[:, 0], reshaped_encrypted[:, 1]
+    decrypted_left, decrypted_right = speck.decrypt_block(left, right)
+
+    decrypted_image = np.column_stack((decrypted_left, decrypted_right)).reshape(256, 256).astype(np.uint8)
+    cv2.imwrite(output_path, decrypted_image)
+
+    print(f"Decrypted image saved as {output_path}")
+
+decrypt_image("encrypted_image.png", "encryption_key.npy", "decrypted_image.png")
+"""
+
+
+"""
+import numpy as np
+import cv2
+from speck_cipher import SpeckCipher
+import os
+import struct
+
+def decrypt_image(encrypted_path, key_path, output_path):
+    # Load key
+    if not os.path.exists(key_path):
+        print(f"Error: Key file {key_path} not found")
+        return
+    key = np.load(key_path)
+    print(f"Using decryption key: {key}")
+    
+    # Load encrypted image from binary file
+    if not os.path.exists(encrypted_path):
+        print(f"Error: Encrypted file {encrypted_path} not found")
+        return
+    
+    # Read binary file
+    with open(encrypted_path, 'rb') as f:
+        # Read header information
+        width, height = struct.unpack('II', f.read(8))
+        print(f"Image dimensions: {width}x{height}")
+        
+        # Read pixel data
+        encrypted_data = np.fromfile(f, dtype=np.uint16)
+        
+    # Reshape data to 2D array
+    if len(encrypted_data) != width * height:
+        print(f"Warning: Data size mismatch. Expected {width*height}, got {len(encrypted_data)}")
+        # Adjust if needed
+        encrypted_data = encrypted_data[:width*height]
+    
+    encrypted_image = encrypted_data.reshape((height, width))
+    print(f"Encrypted image shape: {encrypted_image.shape}")
+    
+    # Initialize SPECK cipher with the key
+    speck = SpeckCipher(key)
+
+    # Create output array
+    decrypted_image = np.zeros_like(encrypted_image, dtype=np.uint16)
+    
+    # Decrypt each pair of pixels
+    for i in range(0, height - 1, 2):
+        for j in range(width):
+            try:
+                decrypted_image[i, j], decrypted_image[i+1, j] = speck.decrypt_block(
+                    int(encrypted_image[i, j]), int(encrypted_image[i+1, j])
+                )
+            except Exception as e:
+                print(f"Error decrypting at position ({i}, {j}): {e}")
+
+    # Convert back to uint8 for saving as an image
+    decrypted_image_uint8 = decrypted_image.astype(np.uint8)
+    
+    # Save the decrypted image
+    cv2.imwrite(output_path, decrypted_image_uint8)
+    
+    # Debug: Save different versions of the image to help diagnose issues
+    cv2.imwrite(output_path + ".raw.png", decrypted_image)
+    
+    print(f"✅ Decrypted image saved as {output_path}")
+    print(f"   Debug version saved as {output_path}.raw.png")
+    print(f"   Shape: {decrypted_image.shape}, Min: {decrypted_image.min()}, Max: {decrypted_image.max()}")"""
+
+
+import numpy as np
+import cv2
+from speck_cipher import SpeckCipher
+from speck_parallel import cipher_image
+from cipher_modes import block_counters, cbc_decrypt, chain_ivs, ctr_keystream, ctr_xor
+from encrypted_image_file import EncryptedImageFile, unpack_payload
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import os
+
+def decrypt_image(encrypted_path, key_path, output_path, workers=1, strip_rows=None, keystream_cache=None):
+    # Large images can be streamed strip by strip instead of loaded whole
+    if strip_rows:
+        return decrypt_image_streaming(encrypted_path, key_path, output_path, strip_rows, workers)
+
+    # Load key
+    if not os.path.exists(key_path):
+        print(f"Error: Key file {key_path} not found")
+        return False
+    key = np.load(key_path)
+    print(f"Using decryption key: {key}")
+    
+    # Load encrypted image from binary file
+    if not os.path.exists(encrypted_path):
+        print(f"Error: Encrypted file {encrypted_path} not found")
+        return False
+    
+    # Map the binary file (legacy v1 or v2); pixel data is paged in only as it is decrypted
+    with EncryptedImageFile(encrypted_path) as encrypted_file:
+        print(f"Image dimensions: {encrypted_file.width}x{encrypted_file.height}x{encrypted_file.channels} "
+              f"(format v{encrypted_file.version})")
+        
+        encrypted_image = encrypted_file.data
+        print(f"Encrypted image shape: {encrypted_image.shape}, Mode: {encrypted_file.cipher_mode.upper()}")
+        
+        # Decrypt every (row i, row i+1) pixel pair of every channel in one batch,
+        # split into bands of row pairs across `workers` processes when requested
+        decrypted_image = cipher_image(encrypted_image, key, decrypt=True, workers=workers,
+                                       mode=encrypted_file.cipher_mode, nonce=encrypted_file.nonce,
+                                       keystream_cache=keystream_cache)
+
+        # Convert back to uint8 for saving as an image (unpacking 'pack8' words)
+        decrypted_image_uint8 = unpack_payload(decrypted_image, encrypted_file.packing)
+    
+    # Save the decrypted image
+    if not cv2.imwrite(output_path, decrypted_image_uint8):
+        print(f"Error: Could not write decrypted image to {output_path}")
+        return False
+    
+    print(f"✅ Decrypted color image saved as {output_path}")
+    print(f"   Shape: {decrypted_image_uint8.shape}, Min: {decrypted_image_uint8.min()}, Max: {decrypted_image_uint8.max()}")
+    return True
+
+
+def decrypt_image_streaming(encrypted_path, key_path, output_path, strip_rows=256, workers=1):
+    """Decrypt a .bin file strip by strip; .npy outputs keep memory O(strip)"""
+    if strip_rows <= 0 or strip_rows % 2 != 0:
+        raise ValueError(f"strip_rows must be a positive even number, got {strip_rows}")
+    
+    for path in [key_path, encrypted_path]:
+        if not os.path.exists(path):
+            print(f"Error: File {path} not found")
+            return False
+    key = np.load(key_path)
+    print(f"Using decryption key: {key}")
+    
+    with EncryptedImageFile(encrypted_path) as encrypted_file:
+        height = encrypted_file.height
+        print(f"Image dimensions: {encrypted_file.width}x{height}x{encrypted_file.channels}")
+        
+        if output_path.endswith('.npy'):
+            # Write strips straight into a memory-mapped .npy file
+            decrypted_image = np.lib.format.open_memmap(
+                output_path, mode='w+', dtype=np.uint8, shape=encrypted_file.shape)
+        else:
+            # Encoders such as PNG need the whole 8-bit frame in memory
+            decrypted_image = np.zeros(encrypted_file.shape, dtype=np.uint8)
+        
+        # Slicing the memmap reads just one strip of the payload at a time;
+        # one process pool is shared by every strip
+        pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+        with pool or nullcontext():
+            for start in range(0, height, strip_rows):
+                strip = encrypted_file.data[start:start + strip_rows]
+                decrypted_image[start:start + strip.shape[0]] = unpack_payload(
+                    cipher_image(strip, key, decrypt=True, workers=workers, pool=pool,
+                                 mode=encrypted_file.cipher_mode, nonce=encrypted_file.nonce,
+                                 first_pair=start // 2),
+                    encrypted_file.packing)
+    
+    if isinstance(decrypted_image, np.memmap):
+        decrypted_image.flush()
+    elif not cv2.imwrite(output_path, decrypted_image):
+        print(f"Error: Could not write decrypted image to {output_path}")
+        return False
+    
+    print(f"✅ Decrypted image streamed to {output_path}")
+    print(f"   Shape: {decrypted_image.shape}, Strip rows: {strip_rows}")
+    return True
+
+def _decrypt_window(encrypted_file, key, start, stop, word_x0, word_x1, channels):
+    """Decrypt the words of rows start:stop, columns word_x0:word_x1 in the file's cipher mode"""
+    data = encrypted_file.data
+    mode, nonce = encrypted_file.cipher_mode, encrypted_file.nonce
+    if mode == 'ecb':
+        return cipher_image(data[start:stop, word_x0:word_x1][:, :, channels], key, decrypt=True)
+    
+    speck = SpeckCipher(key)
+    pair_rows = 2 * ((stop - start) // 2)
+    pairs = np.arange(start // 2, start // 2 + pair_rows // 2)
+    window = data[start:start + pair_rows, word_x0:word_x1]
+    xs, ys = window[0::2], window[1::2]
+    
+    if mode == 'ctr':
+        # Counters follow from block positions, so only the window's keystream is computed
+        counters = block_counters(nonce, pairs, np.arange(word_x0, word_x1), channels,
+                                  data.shape[1], data.shape[2])
+        out_x, out_y = ctr_xor(xs[:, :, channels], ys[:, :, channels], ctr_keystream(speck, counters))
+    else:
+        # CBC: the first block of the window chains from the last channel of the column before it
+        if word_x0 > 0:
+            iv_x = data[start:start + pair_rows:2, word_x0 - 1, -1]
+            iv_y = data[start + 1:start + pair_rows:2, word_x0 - 1, -1]
+        else:
+            iv_x, iv_y = chain_ivs(nonce, pairs)
+        out_x, out_y = cbc_decrypt(speck, xs.reshape(len(pairs), -1), ys.reshape(len(pairs), -1), iv_x, iv_y)
+        out_x = out_x.reshape(xs.shape)[:, :, channels]
+        out_y = out_y.reshape(ys.shape)[:, :, channels]
+    
+    result = np.zeros((stop - start, word_x1 - word_x0, len(channels)), dtype=np.uint16)
+    result[0:pair_rows:2], result[1:pair_rows:2] = out_x, out_y
+    return result
+
+def decrypt_region(encrypted_path, key, y0, y1, x0, x1, channels=None):
+    """Decrypt only the blocks covering rows y0:y1 and columns x0:x1 of an encrypted image"""
+    with EncryptedImageFile(encrypted_path) as encrypted_file:
+        height, width = encrypted_file.height, encrypted_file.width
+        if not (0 <= y0 < y1 <= height and 0 <= x0 < x1 <= width):
+            raise ValueError(f"Region [{y0}:{y1}, {x0}:{x1}] is outside the {width}x{height} image")
+        
+        if channels is None:
+            channels = list(range(encrypted_file.channels))
+        elif np.isscalar(channels):
+            channels = [channels]
+        
+        # Blocks are (row i, row i+1) column pairs, so widen the window to whole row pairs
+        start = y0 - y0 % 2
+        stop = min(y1 + y1 % 2, height)
+        
+        # With 'pack8' each word holds two horizontal samples, so widen to whole words
+        packed = encrypted_file.packing == 'pack8'
+        word_x0, word_x1 = (x0 // 2, (x1 + 1) // 2) if packed else (x0, x1)
+        
+        # Only the pages backing these rows are read from the memory map
+        decrypted_window = unpack_payload(
+            _decrypt_window(encrypted_file, key, start, stop, word_x0, word_x1, channels),
+            encrypted_file.packing)
+    
+    column = x0 - 2 * word_x0 if packed else 0
+    return decrypted_window[y0 - start:y1 - start, column:column + x1 - x0]
@@ -1,208 +1,274 @@
-"""import numpy as np
-import cv2
-
-def speck_encrypt(image, key):
-    return image ^ key  # Simple XOR encryption with the key
-
-def encrypt_image(image_path, key_path, output_path):
-    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-    key = np.load(key_path + ".npy")
-    encrypted_image = speck_encrypt(image, key)
-    cv2.imwrite(output_path, encrypted_image)
-    print(f"Encrypted image saved as {output_path}")
-
-encrypt_image("processed_image.png", "encryption_key", "encrypted_image.png")"""
-"""import numpy as np
-import cv2
-from speck_cipher import SpeckCipher
-
-def encrypt_image(image_path, key_path, output_path):
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        print("Error: Could not load image.")
-        return
-
-    # Resize image to 256x256
-    image = cv2.resize(image, (256, 256), interpolation=cv2.INTER_AREA)
-
-    # Convert to uint16 (scale up from 0-255 to 0-65535)
-    image = image.astype(np.uint16) * 257  
-
-    key = np.random.randint(0, 65536, dtype=np.uint16)
-    np.save(key_path, key)
-
-    speck = SpeckCipher(key)
-
-    encrypted_image = np.zeros_like(image, dtype=np.uint16)
-    
-    for i in range(0, image.shape[0] - 1, 2):
-        for j in range(image.shape[1]):
-            encrypted_image[i, j], encrypted_image[i+1, j] = speck.encrypt_block(image[i, j], image[i+1, j])
-
-    # Save as pure uint16 binary file (ensures correct size)
-    encrypted_image.tofile(output_path)  
-    print(f"✅ Encrypted image saved as {output_path} (Size: {encrypted_image.size * 2} bytes)")
-
-encrypt_image("image.png", "encryption_key.npy", "encrypted_image.bin")"""
-"""
-import numpy as np
-from speck_cipher import SPECKCipher
-from PIL import Image
-
-def encrypt_image(image_path, key_path, output_path):
-    img = Image.open(image_path).convert("L")  # Convert to grayscale
-    img = img.resize((256, 256))  # Ensure 256x256 size
-    img_array = np.array(img, dtype=np.uint16)
-
-    key = np.load(key_path)
-    speck = SPECKCipher(key)
-
-    encrypted_image = np.zeros_like(img_array, dtype=np.uint16)
-
-    for i in range(0, 256, 2):
-        for j in range(256):
-            left = int(img_array[i, j].item())   # Ensure scalar
-            right = int(img_array[i+1, j].item()) # Ensure scalar
-
-            el, er = speck.encrypt_block(left, right)
-
-            encrypted_image[i, j] = np.uint16(el)  # Ensure correct type
-            encrypted_image[i+1, j] = np.uint16(er)
-
-    encrypted_img = Image.fromarray(encrypted_image.astype(np.uint8))
-    encrypted_img.save(output_path)
-
-encrypt_image("image.png", "encryption_key.npy", "encrypted_image.png")
-"""
-
-
-"""
-import numpy as np
-import cv2
-from speck_cipher import SpeckCipher
-import os
-import struct
-
-def encrypt_image(image_path, key_path, output_path):
-    # Read image as grayscale
-    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if image is None:
-        print(f"Error: Could not load image from {image_path}")
-        return
-
-    # Resize image to 256x256
-    image = cv2.resize(image, (256, 256))
-    
-    # Ensure image dimensions are even
-    height, width = image.shape
-    if height % 2 != 0:
-        image = image[:-1, :]
-    if width % 2 != 0:
-        image = image[:, :-1]
-    
-    # Convert to uint16 (original 8-bit values)
-    image = image.astype(np.uint16)
-
-    # Load or generate key
-    if os.path.exists(key_path):
-        key = np.load(key_path)
-    else:
-        key = np.random.randint(0, 65536, dtype=np.uint16)
-        np.save(key_path, key)
-    
-    print(f"Using encryption key: {key}")
-    speck = SpeckCipher(key)
-
-    # Create output array
-    encrypted_image = np.zeros_like(image, dtype=np.uint16)
-    
-    # Encrypt each pair of pixels
-    for i in range(0, height - 1, 2):
-        for j in range(width):
-            encrypted_image[i, j], encrypted_image[i+1, j] = speck.encrypt_block(
-                int(image[i, j]), int(image[i+1, j])
-            )
-    
-    # Write encrypted image to binary file
-    with open(output_path, 'wb') as f:
-        # Write header information (width, height)
-        f.write(struct.pack('II', width, height))
-        
-        # Write pixel data
-        encrypted_image.tofile(f)
-    
-    # Also save as an image for visualization
-    cv2.imwrite(output_path + '.png', (encrypted_image % 256).astype(np.uint8))
-    
-    print(f"✅ Encrypted image saved as {output_path} (Size: {os.path.getsize(output_path)} bytes)")
-    print(f"   Visualization saved as {output_path}.png")
-    print(f"   Shape: {encrypted_image.shape}, Min: {encrypted_image.min()}, Max: {encrypted_image.max()}")"""
-""
-
-
-import numpy as np
-import cv2
-from speck_cipher import SpeckCipher
-import os
-import struct
-
-def encrypt_image(image_path, key_path, output_path):
-    # Read image in color
-    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-    if image is None:
-        print(f"Error: Could not load image from {image_path}")
-        return
-
-    # Resize image to 256x256
-    image = cv2.resize(image, (256, 256))
-    
-    # Ensure image dimensions are even
-    height, width, channels = image.shape
-    if height % 2 != 0:
-        image = image[:-1, :, :]
-    if width % 2 != 0:
-        image = image[:, :-1, :]
-    
-    # Convert to uint16 (original 8-bit values)
-    image = image.astype(np.uint16)
-
-    # Load or generate key
-    if os.path.exists(key_path):
-        key = np.load(key_path)
-    else:
-        key = np.random.randint(0, 65536, dtype=np.uint16)
-        np.save(key_path, key)
-    
-    print(f"Using encryption key: {key}")
-    speck = SpeckCipher(key)
-
-    # Create output array
-    encrypted_image = np.zeros_like(image, dtype=np.uint16)
-    
-    # Encrypt each color channel separately
-    for c in range(channels):
-        # Encrypt each pair of pixels in this channel
-        for i in range(0, height - 1, 2):
-            for j in range(width):
-                encrypted_image[i, j, c], encrypted_image[i+1, j, c] = speck.encrypt_block(
-                    int(image[i, j, c]), int(image[i+1, j, c])
-                )
-    
-    # Write encrypted image to binary file
-    with open(output_path, 'wb') as f:
-        # Write header information (width, height, channels)
-        f.write(struct.pack('III', width, height, channels))
-        
-        # Write pixel data
-        encrypted_image.tofile(f)
-    
-    # Create a visualization by combining all channels
-    visualization = np.zeros((height, width, 3), dtype=np.uint8)
-    for c in range(channels):
-        visualization[:, :, c] = (encrypted_image[:, :, c] % 256).astype(np.uint8)
-    
-    cv2.imwrite(output_path + '.png', visualization)
-    
-    print(f"✅ Encrypted color image saved as {output_path} (Size: {os.path.getsize(output_path)} bytes)")
-    print(f"   Visualization saved as {output_path}.png")
-    print(f"   Shape: {encrypted_image.shape}, Min: {encrypted_image.min()}, Max: {encrypted_image.max()}")
+"""import numpy as np
+import cv2
+
+def speck_encrypt(image, key):
+    return image ^ key  # Simple XOR encryption with the key
+
+def encrypt_image(image_path, key_path, output_path):
+    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    key = np.load(key_path + ".npy")
+    encrypted_image = speck_encrypt(image, key)
+    cv2.imwrite(output_path, encrypted_image)
+    print(f"Encrypted image saved as {output_path}")
+
+encrypt_image("processed_image.png", "encryption_key", "encrypted_image.png")"""
+"""import numpy as np
+import cv2
+from speck_cipher import SpeckCipher
+
+def encrypt_image(image_path, key_path, output_path):
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        print("Error: Could not load image.")
+        return
+
+    # Resize image to 256x256
+    image = cv2.resize(image, (256, 256), interpolation=cv2.INTER_AREA)
+
+    # Convert to uint16 (scale up from 0-255 to 0-65535)
+    image = image.astype(np.uint16) * 257  
+
+    key = np.random.randint(0, 65536, dtype=np.uint16)
+    np.save(key_path, key)
+
+    speck = SpeckCipher(key)
+
+    encrypted_image = np.zeros_like(image, dtype=np.uint16)
+    
+    for i in range(0, image.shape[0] - 1, 2):
+        for j in range(image.shape[1]):
+            encrypted_image[i, j], encrypted_image[i+1, j] = speck.encrypt_block(image[i, j], image[i+1, j])
+
+    # Save as pure uint16 binary file (ensures correct size)
+    encrypted_image.tofile(output_path)  
+    print(f"✅ Encrypted image saved as {output_path} (Size: {encrypted_image.size * 2} bytes)")
+
+encrypt_image("image.png", "encryption_key.npy", "encrypted_image.bin")"""
+"""
+import numpy as np
+from speck_cipher import SPECKCipher
+from PIL import Image
+
+def encrypt_image(image_path, key_path, output_path):
+    img = Image.open(image_path).convert("L")  # Convert to grayscale
+    img = img.resize((256, 256))  # Ensure 256x256 size
+    img_array = np.array(img, dtype=np.uint16)
+
+    key = np.load(key_path)
+    speck = SPECKCipher(key)
+
+    encrypted_image = np.zeros_like(img_array, dtype=np.uint16)
+
+    for i in range(0, 256, 2):
+        for j in range(256):
+            left = int(img_array[i, j].item())   # Ensure scalar
+            right = int(img_array[i+1, j].item()) # Ensure scalar
+
+            el, er = speck.encrypt_block(left, right)
+
+            encrypted_image[i, j] = np.uint16(el)  # Ensure correct type
+            encrypted_image[i+1, j] = np.uint16(er)
+
+    encrypted_img = Image.fromarray(encrypted_image.astype(np.uint8))
+    encrypted_img.save(output_path)
+
+encrypt_image("image.png", "encryption_key.npy", "encrypted_image.png")
+"""
+
+
+"""
+import numpy as np
+import cv2
+from speck_cipher import SpeckCipher
+import os
+import struct
+
+def encrypt_image(image_path, key_path, output_path):
+    # Read image as grayscale
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        print(f"Error: Could not load image from {image_path}")
+        return
+
+    # Resize image to 256x256
+    image = cv2.resize(image, (256, 256))
+    
+    # Ensure image dimensions are even
+    height, width = image.shape
+    if height % 2 != 0:
+        image = image[:-1, :]
+    if width % 2 != 0:
+        image = image[:, :-1]
+    
+    # Convert to uint16 (original 8-bit values)
+    image = image.astype(np.uint16)
+
+    # Load or generate key
+    if os.path.exists(key_path):
+        key = np.load(key_path)
+    else:
+        key = np.random.randint(0, 65536, dtype=np.uint16)
+        np.save(key_path, key)
+    
+    print(f"Using encryption key: {key}")
+    speck = SpeckCipher(key)
+
+    # Create output array
+    encrypted_image = np.zeros_like(image, dtype=np.uint16)
+    
+    # Encrypt each pair of pixels
+    for i in range(0, height - 1, 2):
+        for j in range(width):
+            encrypted_image[i, j], encrypted_image[i+1, j] = speck.encrypt_block(
+                int(image[i, j]), int(image[i+1, j])
+            )
+    
+    # Write encrypted image to binary file
+    with open(output_path, 'wb') as f:
+        # Write header information (width, height)
+        f.write(struct.pack('II', width, height))
+        
+        # Write pixel data
+        encrypted_image.tofile(f)
+    
+    # Also save as an image for visualization
+    cv2.imwrite(output_path + '.png', (encrypted_image % 256).astype(np.uint8))
+    
+    print(f"✅ Encrypted image saved as {output_path} (Size: {os.path.getsize(output_path)} bytes)")
+    print(f"   Visualization saved as {output_path}.png")
+    print(f"   Shape: {encrypted_image.shape}, Min: {encrypted_image.min()}, Max: {encrypted_image.max()}")"""
+""
+
+
+import numpy as np
+import cv2
+from speck_parallel import cipher_image
+from cipher_modes import random_nonce, reserve_counters
+from image_preprocessing import open_image_source
+from encrypted_image_file import EncryptedImageFile, pack_payload, payload_width, unpack_payload
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import os
+
+def load_or_create_key(key_path):
+    """Load the 16-bit key from key_path, generating and saving one if missing"""
+    if os.path.exists(key_path):
+        key = np.load(key_path)
+    else:
+        key = np.random.randint(0, 65536, dtype=np.uint16)
+        np.save(key_path, key)
+    return key
+
+def load_image_for_encryption(image_path):
+    """Read an image as BGR, resized to 256x256 and trimmed to even dimensions (None if unreadable)"""
+    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+
+    # Resize image to 256x256
+    image = cv2.resize(image, (256, 256))
+    
+    # Ensure image dimensions are even
+    height, width, channels = image.shape
+    if height % 2 != 0:
+        image = image[:-1, :, :]
+    if width % 2 != 0:
+        image = image[:, :-1, :]
+    return image
+
+def write_encrypted_image(output_path, encrypted_image, width, height, channels, packing='none', mode='ecb',
+                          nonce=0):
+    """Write encrypted words to a v2 container plus an output_path + '.png' visualization"""
+    with EncryptedImageFile.create(output_path, width, height, channels, packing=packing,
+                                   cipher_mode=mode, nonce=nonce) as encrypted_file:
+        encrypted_file.data[...] = encrypted_image
+    
+    # Create a visualization by combining all channels
+    visualization = np.zeros((height, width, 3), dtype=np.uint8)
+    encrypted_samples = unpack_payload(encrypted_image, packing)
+    for c in range(channels):
+        visualization[:, :, c] = encrypted_samples[:, :, c]
+    
+    cv2.imwrite(output_path + '.png', visualization)
+
+def encrypt_image(image_path, key_path, output_path, workers=1, strip_rows=None, packing='none', mode='ecb',
+                  nonce=None, keystream_cache=None):
+    # Large images can be streamed strip by strip at full resolution instead
+    if strip_rows:
+        return encrypt_image_streaming(image_path, key_path, output_path, strip_rows, workers, packing, mode)
+
+    # Read image in color, resized to 256x256 with even dimensions
+    image = load_image_for_encryption(image_path)
+    if image is None:
+        print(f"Error: Could not load image from {image_path}")
+        return False
+    height, width, channels = image.shape
+    
+    # Convert to uint16 words: one 8-bit value per word, or two with packing='pack8'
+    image = pack_payload(image, packing)
+
+    # Load or generate key
+    key = load_or_create_key(key_path)
+    print(f"Using encryption key: {key}")
+
+    # CTR and CBC need a fresh nonce per image; it is stored in the file header.
+    # CTR takes a counter range no earlier image of this key used (see reserve_counters).
+    # Passing a fixed nonce lets a KeystreamCache serve repeat CTR encryptions,
+    # but the same (key, nonce) must never be used for two different images
+    if mode == 'ecb':
+        nonce = 0
+    elif nonce is None:
+        nonce = reserve_counters(key_path, image.size // 2) if mode == 'ctr' else random_nonce()
+
+    # Encrypt every (row i, row i+1) pixel pair of every channel in one batch,
+    # split into bands of row pairs across `workers` processes when requested
+    encrypted_image = cipher_image(image, key, workers=workers, mode=mode, nonce=nonce,
+                                   keystream_cache=keystream_cache)
+    
+    # Write encrypted image to a v2 container file (header, chunk table, pixel data)
+    # and a visualization that combines all channels
+    write_encrypted_image(output_path, encrypted_image, width, height, channels, packing, mode, nonce)
+    
+    print(f"✅ Encrypted color image saved as {output_path} (Size: {os.path.getsize(output_path)} bytes)")
+    print(f"   Visualization saved as {output_path}.png")
+    print(f"   Shape: {encrypted_image.shape}, Min: {encrypted_image.min()}, Max: {encrypted_image.max()}")
+    return True
+
+
+def encrypt_image_streaming(image_path, key_path, output_path, strip_rows=256, workers=1, packing='none',
+                            mode='ecb'):
+    """Encrypt an 8-bit image of any size in strips of row pairs, keeping memory O(strip)"""
+    if strip_rows <= 0 or strip_rows % 2 != 0:
+        raise ValueError(f"strip_rows must be a positive even number, got {strip_rows}")
+    
+    image = open_image_source(image_path)
+    if image is None:
+        return False
+    
+    # No resizing here; only trim to even dimensions like encrypt_image does
+    height, width, channels = image.shape
+    height -= height % 2
+    width -= width % 2
+    
+    key = load_or_create_key(key_path)
+    print(f"Using encryption key: {key}")
+    if mode == 'ctr':
+        nonce = reserve_counters(key_path, (height // 2) * payload_width(width, packing) * channels)
+    else:
+        nonce = random_nonce() if mode != 'ecb' else 0
+    
+    # One v2 chunk per strip; each holds whole row pairs, so chunks encrypt
+    # independently and one process pool is shared by every strip
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    with EncryptedImageFile.create(output_path, width, height, channels, chunk_rows=strip_rows,
+                                   packing=packing, cipher_mode=mode, nonce=nonce) as encrypted_file, \
+            pool or nullcontext():
+        for index in range(encrypted_file.n_chunks):
+            start, stop = encrypted_file.chunk_bounds(index)
+            strip = pack_payload(image[start:stop, :width], packing)
+            encrypted_file.write_chunk(index, cipher_image(
+                strip, key, workers=workers, pool=pool, mode=mode, nonce=nonce, first_pair=start // 2))
+    
+    print(f"✅ Encrypted image streamed to {output_path} (Size: {os.path.getsize(output_path)} bytes)")
+    print(f"   Shape: ({height}, {width}, {channels}), Strip rows: {strip_rows}")
+    return True
@@ -0,0 +1,79 @@
+import os
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from speck_cipher import SpeckCipher
+from cipher_modes import cipher_pairs
+
+def cipher_rows(speck, rows, out, decrypt=False, mode='ecb', nonce=0, first_pair=0, keystream_cache=None):
+    """Encrypt or decrypt every (row i, row i+1) pixel pair of rows into out"""
+    # first_pair is the global index of the first row pair, used by CTR and CBC
+    pair_rows = 2 * (rows.shape[0] // 2)
+    out[0:pair_rows:2], out[1:pair_rows:2] = cipher_pairs(
+        speck, rows[0:pair_rows:2], rows[1:pair_rows:2], decrypt, mode, nonce, first_pair, keystream_cache
+    )
+
+def split_bands(height, bands):
+    """Split the row pairs of an image into (start_row, stop_row) bands"""
+    pairs = height // 2
+    bounds = np.linspace(0, pairs, min(bands, pairs) + 1).astype(int)
+    return [(2 * start, 2 * stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+def _cipher_band(task):
+    """Worker: attach to the shared images and process one band of row pairs"""
+    input_name, output_name, shape, key, start, stop, decrypt, mode, nonce, first_pair = task
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    try:
+        image = np.ndarray(shape, dtype=np.uint16, buffer=input_shm.buf)
+        result = np.ndarray(shape, dtype=np.uint16, buffer=output_shm.buf)
+        cipher_rows(SpeckCipher(key), image[start:stop], result[start:stop], decrypt,
+                    mode, nonce, first_pair + start // 2)
+        # Drop the views before closing, otherwise the buffers stay exported
+        del image, result
+    finally:
+        input_shm.close()
+        output_shm.close()
+    return start, stop
+
+def cipher_image(image, key, decrypt=False, workers=1, pool=None, mode='ecb', nonce=0, first_pair=0,
+                 keystream_cache=None):
+    """Encrypt or decrypt a uint16 image, optionally across a pool of processes"""
+    image = np.asarray(image).astype(np.uint16)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Blocks never cross a row pair, so bands of row pairs are independent.
+    # A cached CTR keystream reduces the work to one XOR, so that stays in-process
+    bands = split_bands(image.shape[0], workers)
+    if len(bands) <= 1 or (mode == 'ctr' and keystream_cache is not None):
+        result = np.zeros_like(image)
+        cipher_rows(SpeckCipher(key), image, result, decrypt, mode, nonce, first_pair, keystream_cache)
+        return result
+
+    # Hand the image to the workers through shared memory instead of pickling it
+    input_shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+    output_shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+    try:
+        shared_image = np.ndarray(image.shape, dtype=np.uint16, buffer=input_shm.buf)
+        shared_image[...] = image
+        shared_result = np.ndarray(image.shape, dtype=np.uint16, buffer=output_shm.buf)
+        shared_result[...] = 0
+
+        tasks = [(input_shm.name, output_shm.name, image.shape, int(key), start, stop, decrypt,
+                  mode, nonce, first_pair) for start, stop in bands]
+        # Callers streaming many strips pass in one long-lived pool to reuse
+        with nullcontext(pool) if pool else ProcessPoolExecutor(max_workers=len(bands)) as executor:
+            list(executor.map(_cipher_band, tasks))
+
+        result = shared_result.copy()
+        del shared_image, shared_result
+    finally:
+        input_shm.close()
+        input_shm.unlink()
+        output_shm.close()
+        output_shm.unlink()
+
+    return result